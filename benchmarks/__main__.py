@@ -0,0 +1,5 @@
+"""Run benchmarks, see `benchmarks.run`."""
+
+from .run import main
+
+main()
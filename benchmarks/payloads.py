@@ -0,0 +1,166 @@
+"""Synthetic payloads of representative shapes.
+
+Each scenario returns `(constrain, payloads)`, payloads are generated with a
+seeded random, so runs with the same seed and scale are comparable.
+"""
+# -*- coding: utf-8 -*-
+
+from datetime import datetime
+from random import Random
+
+SCENARIOS = {}
+
+
+def scenario(name, **options):
+    """Register a payloads generator, with options of its validator."""
+    def register(function):
+        SCENARIOS[name] = (function, options)
+        return function
+    return register
+
+
+def record_constrain():
+    """Return the constrain of a flat record."""
+    return {
+        'id': {'type': int, 'gt': 0},
+        'name': {'format': r'^[a-z]+$'},
+        'score': {'type': float, 'gt': 0.0, 'lt': 100.0},
+        'active': {'type': bool},
+        'kind': {'in': ['a', 'b', 'c']},
+        'note': {'default': ''},
+    }
+
+
+def record(rand, index, bad=0.0):
+    """Return a flat record, each value is invalid with `bad` probability."""
+    value = {
+        'id': index + 1,
+        'name': ''.join(rand.choice('abcdef') for _ in range(8)),
+        'score': rand.uniform(1, 99),
+        'active': rand.random() < 0.5,
+        'kind': rand.choice('abc'),
+    }
+    for key in list(value):
+        if rand.random() < bad:
+            value[key] = rand.choice([None, 'X1', -1, []])
+    return value
+
+
+@scenario('wide_flat')
+def wide_flat(rand, scale):
+    """Return objects with many flat fields."""
+    width = 200 * scale
+    constrain = {}
+    for index in range(width):
+        if index % 2:
+            constrain['f{}'.format(index)] = {'type': int, 'gt': 0}
+        else:
+            constrain['f{}'.format(index)] = {'format': r'^\w+$'}
+    payloads = [{key: rand.randint(1, 100) if rule.get('type') is int
+                 else 'value{}'.format(rand.randint(1, 100))
+                 for key, rule in constrain.items()} for _ in range(10)]
+    return constrain, payloads
+
+
+@scenario('deep_nesting')
+def deep_nesting(rand, scale):
+    """Return objects nested many levels deep."""
+    depth = 50 * scale
+    constrain = rules = {}
+    payload = value = {}
+    for _ in range(depth):
+        rules['leaf'] = {'type': int}
+        rules['child'] = {'type': dict, 'properties': {}}
+        value['leaf'] = rand.randint(1, 100)
+        value['child'] = {}
+        rules = rules['child']['properties']
+        value = value['child']
+    return constrain, [payload]
+
+
+@scenario('number_list')
+def number_list(rand, scale):
+    """Return long lists of bounded numbers."""
+    constrain = {'values': {
+        'type': list, 'items': {'type': int, 'gt': 0, 'lt': 1000}}}
+    payloads = [{'values': [rand.randint(1, 999)
+                            for _ in range(10000 * scale)]}
+                for _ in range(5)]
+    return constrain, payloads
+
+
+@scenario('records')
+def records(rand, scale):
+    """Return lists of flat records."""
+    constrain = {'records': {
+        'type': list,
+        'items': {'type': dict, 'properties': record_constrain()}}}
+    payloads = [{'records': [record(rand, index)
+                             for index in range(1000 * scale)]}
+                for _ in range(5)]
+    return constrain, payloads
+
+
+@scenario('errors')
+def errors(rand, scale):
+    """Return lists of records with many invalid values."""
+    constrain, _ = records(rand, 0)
+    payloads = [{'records': [record(rand, index, bad=0.3)
+                             for index in range(1000 * scale)]}
+                for _ in range(5)]
+    return constrain, payloads
+
+
+@scenario('errors_lazy', lazy=True)
+def errors_lazy(rand, scale):
+    """Return lists of records with many invalid values, validated lazily."""
+    return errors(rand, scale)
+
+
+@scenario('datetime')
+def datetimes(rand, scale):
+    """Return lists of events with datetimes of common formats."""
+    constrain = {'events': {'type': list, 'items': {
+        'type': dict, 'properties': {
+            'at': {'type': datetime, 'dformat': '%Y-%m-%dT%H:%M:%S'},
+            'day': {'type': datetime, 'dformat': '%Y-%m-%d'},
+            'local': {'type': datetime, 'dformat': '%d/%m/%Y %H:%M'},
+        }}}}
+    payloads = []
+    for _ in range(5):
+        events = []
+        for _ in range(1000 * scale):
+            date = datetime(rand.randint(2000, 2030), rand.randint(1, 12),
+                            rand.randint(1, 28), rand.randint(0, 23),
+                            rand.randint(0, 59), rand.randint(0, 59))
+            events.append({'at': date.strftime('%Y-%m-%dT%H:%M:%S'),
+                           'day': date.strftime('%Y-%m-%d'),
+                           'local': date.strftime('%d/%m/%Y %H:%M')})
+        payloads.append({'events': events})
+    return constrain, payloads
+
+
+@scenario('format')
+def formats(rand, scale):
+    """Return lists of records with many regex checked fields."""
+    constrain = {'users': {'type': list, 'items': {
+        'type': dict, 'properties': {
+            'email': {'format': r'^[a-z0-9.]+@[a-z]+\.[a-z]{2,}$'},
+            'phone': {'format': r'^\+?[0-9]{7,12}$'},
+            'zip': {'format': r'^[0-9]{5}$'},
+            'code': {'format': r'^[A-Z]{3}-[0-9]{4}$'},
+        }}}}
+    payloads = [{'users': [{
+        'email': 'user{}@example.com'.format(rand.randint(1, 9999)),
+        'phone': '+{}'.format(rand.randint(10 ** 8, 10 ** 10)),
+        'zip': '{:05d}'.format(rand.randint(0, 99999)),
+        'code': 'ABC-{:04d}'.format(rand.randint(0, 9999)),
+    } for _ in range(1000 * scale)]} for _ in range(5)]
+    return constrain, payloads
+
+
+def generate(name, seed=0, scale=1):
+    """Return `(constrain, payloads, options)` of a scenario."""
+    function, options = SCENARIOS[name]
+    constrain, payloads = function(Random(seed), scale)
+    return constrain, payloads, options
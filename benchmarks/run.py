@@ -0,0 +1,183 @@
+"""Run benchmarks of the validator and report them as json.
+
+Usage::
+
+    python -m benchmarks --output results.json
+    python -m benchmarks --compare results.json
+"""
+# -*- coding: utf-8 -*-
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+from json_validator import ENGINES, JsonValidator
+
+from .payloads import SCENARIOS, generate
+
+PERCENTILES = (50, 90, 99)
+
+VERSION = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'VERSION')
+
+# Settings that must match to compare runs.
+SETTINGS = ('seed', 'scale', 'encoded')
+
+
+def percentile(values, percent):
+    """Return the percentile of sorted values, nearest rank."""
+    index = int(round(percent / 100.0 * (len(values) - 1)))
+    return values[index]
+
+
+def peak_memory(validate, payloads):
+    """Return the peak bytes allocated while validating payloads once."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        for payload in payloads:
+            validate(payload)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def measure(validate, payloads, min_time, min_ops):
+    """Validate payloads in turn, return the latency of each validation."""
+    clock = time.perf_counter
+    latencies = []
+    started = clock()
+    while len(latencies) < min_ops or clock() - started < min_time:
+        for payload in payloads:
+            start = clock()
+            validate(payload)
+            latencies.append(clock() - start)
+    return latencies
+
+
+def run_scenario(name, engine, args):
+    """Return the results of a scenario with an engine."""
+    constrain, payloads, options = generate(name, args.seed, args.scale)
+    if args.encoded:
+        payloads = [json.dumps(payload).encode() for payload in payloads]
+    validator = JsonValidator(constrain, engine=engine, **options)
+    validate = validator.validate
+
+    for payload in payloads:
+        validate(payload)
+    latencies = sorted(measure(validate, payloads, args.min_time,
+                               args.min_ops))
+
+    return {
+        'scenario': name,
+        'engine': engine,
+        'options': options,
+        'payloads': len(payloads),
+        'payload_bytes': sum(
+            len(payload if args.encoded else json.dumps(payload))
+            for payload in payloads) // len(payloads),
+        'ops': len(latencies),
+        'ops_per_sec': len(latencies) / sum(latencies),
+        'latency_us': dict(
+            [('p{}'.format(percent), percentile(latencies, percent) * 1e6)
+             for percent in PERCENTILES] +
+            [('max', latencies[-1] * 1e6)]),
+        'peak_memory_bytes': peak_memory(validate, payloads),
+    }
+
+
+def compare(results, baseline):
+    """Print the ops/sec of results against the ones of a baseline run."""
+    for setting in SETTINGS:
+        if results['meta'][setting] != baseline['meta'][setting]:
+            print('Warning: baseline {} is {}, not {}'.format(
+                setting, baseline['meta'][setting],
+                results['meta'][setting]))
+    base = {(item['scenario'], item['engine']): item
+            for item in baseline['results']}
+    print('{:<14} {:<12} {:>12} {:>12} {:>8}'.format(
+        'scenario', 'engine', 'ops/sec', 'baseline', 'ratio'))
+    for item in results['results']:
+        old = base.get((item['scenario'], item['engine']))
+        old_ops = old['ops_per_sec'] if old else float('nan')
+        print('{:<14} {:<12} {:>12.1f} {:>12.1f} {:>8.2f}'.format(
+            item['scenario'], item['engine'], item['ops_per_sec'], old_ops,
+            item['ops_per_sec'] / old_ops))
+
+
+def report(results):
+    """Print a table of results."""
+    print('{:<14} {:<12} {:>12} {:>10} {:>10} {:>10} {:>12}'.format(
+        'scenario', 'engine', 'ops/sec', 'p50 us', 'p90 us', 'p99 us',
+        'peak KiB'))
+    for item in results['results']:
+        latency = item['latency_us']
+        print('{:<14} {:<12} {:>12.1f} {:>10.1f} {:>10.1f} {:>10.1f} '
+              '{:>12.1f}'.format(
+                  item['scenario'], item['engine'], item['ops_per_sec'],
+                  latency['p50'], latency['p90'], latency['p99'],
+                  item['peak_memory_bytes'] / 1024.0))
+
+
+def parse_args(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(prog='python -m benchmarks',
+                                     description=__doc__.splitlines()[0])
+    parser.add_argument('scenarios', nargs='*', metavar='scenario',
+                        help='scenarios to run, all by default: {}'.format(
+                            ', '.join(sorted(SCENARIOS))))
+    parser.add_argument('--engine', action='append', choices=ENGINES,
+                        help='engines to run, all by default')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--scale', type=int, default=1,
+                        help='multiplies the size of payloads')
+    parser.add_argument('--min-time', type=float, default=1.0,
+                        help='seconds to run each scenario, at least')
+    parser.add_argument('--min-ops', type=int, default=10,
+                        help='validations of each scenario, at least')
+    parser.add_argument('--encoded', action='store_true',
+                        help='validate json bytes, decoding included')
+    parser.add_argument('--output', help='json file to write results to')
+    parser.add_argument('--compare', help='json file of a baseline run')
+    args = parser.parse_args(argv)
+    for name in args.scenarios:
+        if name not in SCENARIOS:
+            parser.error('unknown scenario {}'.format(name))
+    return args
+
+
+def main(argv=None):
+    """Run the benchmarks and report them."""
+    args = parse_args(argv)
+    with open(VERSION) as _file:
+        version = _file.read().strip()
+    results = {
+        'meta': {
+            'version': version,
+            'python': sys.version.split()[0],
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'date': datetime.now().isoformat(),
+            'seed': args.seed,
+            'scale': args.scale,
+            'encoded': args.encoded,
+        },
+        'results': [run_scenario(name, engine, args)
+                    for name in args.scenarios or sorted(SCENARIOS)
+                    for engine in args.engine or ENGINES],
+    }
+
+    report(results)
+    if args.output:
+        with open(args.output, 'w') as _file:
+            json.dump(results, _file, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as _file:
+            compare(results, json.load(_file))
+    return results
@@ -1,141 +1,543 @@
 """Json schema validator module."""
 # -*- coding: utf-8 -*-
 
-from re import match
+from codecs import decode
 from datetime import datetime
 
-from json import loads
+from json import loads as json_loads
 
 try:
-    from json.decoder import JSONDecodeError
+    from json import detect_encoding
 except ImportError:
-    JSONDecodeError = ValueError
+    detect_encoding = None
+
+from .cache import ResultCache, calls_defaults
+from .codegen import build
+from .columns import BUFFERS, validate_columns
+from .decoding import SchemaDecoder
+from .errors import ErrorsWalker, ValidationError
+from .lookup import LookupTable
+from .mask import Mask
+from .parallel import validate_many
+from .patch import apply_patch
+from .registry import REGISTRY, Registry, freeze
+from .stats import Stats, interpret as interpret_profiled
+from .stream import CHUNK_SIZE, iter_validate_array, iter_validate_lines
+from .schema import (
+    Changes, ChangesFrame, DateParser, Frame, apply_changes,
+    compile_constrain, error_key)
+from .walker import ChangesWalker, FirstErrorWalker, Walker
 
 try:
     UNICODE = unicode
 except NameError:
     unicode = str
 
+__all__ = (
+    'ENGINES', 'ERRORS', 'REGISTRY', 'JsonValidator', 'LookupTable', 'Mask',
+    'Registry', 'ValidationError', 'freeze')
+
 ERRORS = {
     '1': 'INVALID PAYLOAD',
-    '2': 'INVALID DATA TYPE'
+    '2': 'INVALID DATA TYPE',
+    '3': 'INVALID PATCH',
 }
 
+ENGINES = ('interpreter', 'codegen')
+RESULTS = ('copy', 'input')
+DECODES = ('json', 'schema')
+ERROR_MODES = ('str', 'object')
+
+# Masks of field lists kept by each validator, see `JsonValidator.mask`.
+MASKS_SIZE = 64
+
+# Binary payloads decoded before `json.loads`, which takes bytes and
+# bytearray on python 3.6+ and str, its bytes, on python 2.
+try:
+    json_loads(bytearray(b'0'))
+    BINARY = (memoryview,)
+except TypeError:
+    BINARY = (bytearray, memoryview)
+    if bytes is not str:
+        BINARY += (bytes,)
+
+
+def decode_binary(data):
+    """Return the text of a binary json payload, raise ValueError if bad."""
+    if detect_encoding is not None and not isinstance(data, memoryview):
+        return data.decode(detect_encoding(data), 'surrogatepass')
+    return decode(data, 'utf-8-sig')
+
 
 class JsonValidator:
     """Json Schema validator."""
 
     def __init__(self, constrain, lazy=False, decode_error=None,
-                 data_error=None):
-        """Set the constrain in object."""
+                 data_error=None, engine='interpreter', loads=None,
+                 result='copy', cache_size=0, cache_memory=None,
+                 profile=False, registry=None, decode='json', errors='str',
+                 max_errors=None):
+        """Set the constrain in object.
+
+        With `engine='codegen'` a python function is generated for the whole
+        constrain, its source is kept in `source`. Constrains nested too
+        deep for the python compiler fall back to the interpreter.
+
+        `loads` replaces `json.loads` to decode payloads, it gets str,
+        bytes, bytearray or memoryview and raises ValueError when invalid.
+
+        With `result='input'` the decoded input is returned as result, not
+        a copy of its valid fields, unknown keys and bad values included.
+        Only the containers holding defaults or parsed datetimes are copied,
+        payloads decoded by the validator are changed in place. This mode
+        always uses the interpreter.
+
+        With `cache_size` the results of that many str or bytes payloads
+        are kept, taking at most `cache_memory` bytes with their payloads, and
+        returned again for identical payloads, see `ResultCache`. Constrains
+        with callable defaults are not cached.
+
+        With `profile` validations record counts and seconds by rule kind
+        and by field, and errors by field, see `stats`. When `profile` is a
+        callable it is called after each validation with its own stats.
+        Validators without it run no profiling code at all.
+
+        With `registry`, a `Registry` or True for the shared `REGISTRY`,
+        validators of structurally equal constrains share their compiled
+        schema and generated functions.
+
+        With `decode='schema'` str and bytes payloads are decoded guided by
+        the constrain, values of unknown keys are dropped as they are
+        decoded. Lazy validators stop decoding at the first error, as soon
+        as the fields before it in the constrain are decoded, so results
+        and errors are the ones of a whole decoding. Payloads with repeated
+        keys, where the last one wins, or invalid json after the first
+        error may give that error instead. Not available with `loads` or
+        `result='input'`.
+
+        With `errors='object'` errors are `ValidationError` objects, with
+        the code of the rule, the field, limit and value, their messages
+        are only formatted when rendered. With `max_errors` validation
+        stops after that many errors. Both always use the interpreter and
+        need result copy, without profile.
+        """
         if not isinstance(constrain, dict):
             raise AttributeError('constrain must be a dict')
+        if engine not in ENGINES:
+            raise AttributeError('engine must be one of {}'.format(
+                ', '.join(ENGINES)))
+        if result not in RESULTS:
+            raise AttributeError('result must be one of {}'.format(
+                ', '.join(RESULTS)))
+        if profile and result != 'copy':
+            raise AttributeError('profile needs result copy')
+        if errors not in ERROR_MODES:
+            raise AttributeError('errors must be one of {}'.format(
+                ', '.join(ERROR_MODES)))
+        if max_errors is not None and max_errors < 1:
+            raise AttributeError('max_errors must be at least 1')
+        plain_errors = errors == 'str' and max_errors is None
+        if not plain_errors and (profile or result != 'copy'):
+            raise AttributeError('errors object and max_errors need result '
+                                 'copy without profile')
+        if decode not in DECODES:
+            raise AttributeError('decode must be one of {}'.format(
+                ', '.join(DECODES)))
+        if decode == 'schema' and (loads is not None or result != 'copy'):
+            raise AttributeError('decode schema needs json loads and result '
+                                 'copy')
+        if registry is True:
+            registry = REGISTRY
         self.constrain = constrain
+        self.registry = registry
+        if registry is not None:
+            self.schema = registry.compile(constrain)
+        else:
+            self.schema = compile_constrain(constrain)
         self.lazy = lazy
         self.decode_error = decode_error
         self.data_error = data_error
+        self.engine = engine
+        self.loads = loads or json_loads
+        self.result = result
+        self.cache = None
+        if cache_size and not calls_defaults(self.schema):
+            self.cache = ResultCache(cache_size, cache_memory)
+        self.profile = profile
+        self.decode = decode
+        self.errors = errors
+        self.max_errors = max_errors
+        self._plain_errors = plain_errors
+        self._stats = Stats() if profile else None
+        self._masks = {}
+        self._set_engine()
+
+    def __getstate__(self):
+        """Return picklable state, the generated function is not."""
+        state = self.__dict__.copy()
+        del state['_run']
+        del state['_check']
+        del state['source']
+        del state['_decoder']
+        state['registry'] = None
+        state['_masks'] = {}
+        return state
+
+    def __setstate__(self, state):
+        """Restore state, generating again the function if needed."""
+        self.__dict__.update(state)
+        self._set_engine()
+
+    def _set_engine(self):
+        """Set the functions that run validations."""
+        self.source = None
+        self._run = self._interpret
+        self._check = self._first_error
+        self._decoder = None
+        if self.decode == 'schema':
+            self._decoder = SchemaDecoder(self.schema)
+
+        if self.engine == 'codegen' and self._plain_errors:
+            generate = build
+            if self.registry is not None:
+                generate = self.registry.build
+            try:
+                run = generate(self.schema, self.lazy)
+                self._check = generate(self.schema, check_only=True)
+                self._run = run
+                self.source = run.source
+            except (SyntaxError, RuntimeError, MemoryError):
+                pass
+
+        if self.profile:
+            self._run = self._profile
+
+    def validate(self, data, constrain=None, only=None):
+        """Validate incoming data.
+
+        With `only`, a list of fields or a `Mask`, only those fields are
+        validated and returned, see `mask`.
+        """
+        if self.cache is not None and not constrain and only is None:
+            return self.cache.validate(data, self._validate)
+        return self._validate(data, constrain, only)
 
-    def validate(self, data, constrain=None):
-        """Validate incoming data."""
-        res = {}
-        errors = {}
-        data, err = self._convert(data)
+    def _validate(self, data, constrain=None, only=None):
+        """Validate incoming data, without the cache."""
+        payload = data
+        if self._decoder is not None and not constrain and only is None:
+            data, err = self._decode(data, self.lazy)
+        else:
+            data, err = self._convert(data, self.loads)
 
         if err and err in ('1', '2'):
-            return (None, (self.decode_error or {
-                'payload': ERRORS.get(err, '')}))
+            return self._payload_error(err)
 
-        stack = []
-        constrain = constrain or self.constrain
-        my_field = ''
+        schema = constrain and compile_constrain(constrain) or None
+        mask = None
+        if only is not None:
+            mask = self._mask(only, schema or self.schema)
+            schema = mask.schema
 
+        if self.result == 'input':
+            return self._interpret_input(data, schema, data is payload)
         if constrain:
-            stack.append((res, errors, my_field, data, constrain))
-
-        while stack:
-            temp_res, temp_errors, my_field, data, constrain = stack.pop()
-
-            if constrain is None:
-                continue
-
-            for key, rule in constrain.items():
-                field = my_field + '.' + key if my_field else key
-
-                if key not in data:
-                    if rule.get('default', False):
-                        if callable(rule['default']):
-                            temp_res[key] = rule['default']()
-                        else:
-                            temp_res[key] = rule['default']
-                    else:
-                        temp_errors[field] = rule.get('error', 'Missing field')
-                        if self.lazy:
-                            break
-                else:
-                    self._key_match(data[key], rule, key, field, temp_res,
-                                    temp_errors, stack)
-                    if temp_errors and self.lazy:
-                        self.clean_data(res)
-                        return res, errors
-
-        self.clean_data(errors)
-        self.clean_data(res)
-        return res, errors
-
-    def _key_match(self, my_obj, my_rules, my_key, my_field, my_res, my_errors,
-                   stack):
-        """Validate object with rueles."""
-        matcheds = [(my_obj, my_rules, my_key, my_field, my_res, my_errors)]
-
-        while matcheds:
-            obj, rules, key, field, res, errors = matcheds.pop()
-            splitted = field.split('.')
-            err_field = field
+            return self._interpret(data, schema)
+        if mask is not None:
+            return self._run_mask(data, mask)
+        return self._run(data)
+
+    def mask(self, paths):
+        """Return a reusable `Mask` of fields to validate with `only`.
+
+        Fields are dotted, like `order.total`, or tuples of keys. Items of
+        lists are selected with `*`, like `order.items.*.sku`, or directly
+        with the keys of their properties, like `order.items.sku`. Fields,
+        their ancestors and their children are validated, other fields are
+        skipped, missing ones are not errors.
+        """
+        return self._mask(paths, self.schema)
+
+    def _mask(self, only, schema):
+        """Return the mask of only, a Mask or a list of fields of schema.
+
+        Masks of field lists of the validator constrain are kept, at most
+        `MASKS_SIZE` of them.
+        """
+        if isinstance(only, Mask):
+            if only.source is not schema:
+                raise AttributeError('mask is not of this constrain')
+            return only
+        if schema is not self.schema or not isinstance(only, (list, tuple)):
+            return Mask(schema, only)
+
+        key = tuple(tuple(path) if isinstance(path, list) else path
+                    for path in only)
+        mask = self._masks.get(key)
+        if mask is None:
+            mask = Mask(schema, only)
+            if len(self._masks) >= MASKS_SIZE:
+                self._masks.clear()
+            self._masks[key] = mask
+        return mask
+
+    def _run_mask(self, data, mask):
+        """Validate data with the engine of the validator and a mask."""
+        if self.profile:
+            return self._profile(data, mask.schema)
+        if self.engine == 'codegen' and self._plain_errors:
+            run = mask.function(self.lazy)
+            if run is not None:
+                return run(data)
+        return self._interpret(data, mask.schema)
+
+    def validate_patch(self, data, patch, previous, full=False):
+        """Apply a patch to a validated document, validating its changes.
+
+        `data` is the decoded document and `previous` the `(res, errors)` of
+        its validation. Lists are json patches (RFC 6902), dicts merge
+        patches (RFC 7386), str and bytes patches are decoded first.
+        Returns `(data, res, errors)` of the patched document, a copy,
+        `data` is not changed.
+
+        Only the top level fields changed by the patch are validated again,
+        results and errors are the ones of a full validation, but callable
+        defaults of other fields are not called again. With `full`, lazy
+        validators, `result='input'`, `max_errors` or patches replacing the
+        whole document, the whole document is validated.
+
+        Patches that can not be applied return `data` with a payload error.
+        """
+        patch, err = self._convert(patch, self.loads)
+        if err and err in ('1', '2'):
+            return (data,) + self._payload_error('3' if err == '2' else err)
+        try:
+            document, keys = apply_patch(data, patch)
+        except ValueError:
+            return (data,) + self._payload_error('3')
+
+        res, errors = previous
+        if keys is not None:
+            keys = [key for key in keys if key in self.constrain]
+        if (full or self.lazy or self.result != 'copy' or keys is None or
+                self.max_errors is not None or
+                res is None or not isinstance(document, dict) or
+                any(not isinstance(key, (str, unicode)) or
+                    error_key(None, key) != key for key in keys)):
+            return (document,) + self._validate(document)
+
+        res = dict(res)
+        errors = dict(errors)
+        if not keys:
+            return document, res, errors
+
+        mask = self._mask([(key,) for key in sorted(keys)], self.schema)
+        changed_res, changed_errors = self._run_mask(document, mask)
+        for key in keys:
+            res.pop(key, None)
+            errors.pop(key, None)
+        res.update(changed_res)
+        errors.update(changed_errors)
+        return document, res, errors
+
+    def is_valid(self, data):
+        """Check if data is valid, without building results."""
+        return self.first_error(data) is None
+
+    def first_error(self, data):
+        """Return `(field, message)` of the first error found, or None.
+
+        Results and errors are not built, the dotted field of the error is
+        returned, list items included. Payload errors return the first item
+        of the payload error, `('payload', error)` if it is not a dict.
+        """
+        if self._decoder is not None:
+            data, err = self._decode(data, True)
+        else:
+            data, err = self._convert(data, self.loads)
 
-            try:
-                err_field = int(
-                    splitted[len(splitted) - 1]) if splitted else field
-            except ValueError:
-                pass
+        if err and err in ('1', '2'):
+            error = self._payload_error(err)[1]
+            if isinstance(error, dict) and error:
+                return next(iter(error.items()))
+            return 'payload', error
+
+        return self._check(data)
+
+    def _payload_error(self, err):
+        """Return the result of a payload that can not be validated."""
+        return (None, (self.decode_error or {
+            'payload': ERRORS.get(err, '')}))
+
+    def validate_async(self, data, executor=None, inline_size=None):
+        """Return a coroutine validating data without blocking the loop.
+
+        Payloads up to `inline_size` bytes (64 KiB by default) are validated
+        in the loop, bigger ones, and already decoded dicts and lists, in
+        `executor`, the default one of the loop when None. Process pools
+        pickle the validator on each call. Requires python 3.6+.
+        """
+        from .aio import validate_async
+        return validate_async(self, data, executor, inline_size)
+
+    def aiter_validate_lines(self, reader, skip_valid=False,
+                             errors_only=False, max_errors=None,
+                             executor=None, inline_size=None):
+        """Validate each line of a json lines `asyncio.StreamReader`.
+
+        Async iterator of `(line_no, res, errors)`, yielded as lines arrive,
+        with the options of `iter_validate_lines`. Each line is validated
+        like with `validate_async`. Requires python 3.6+.
+        """
+        from .aio import aiter_validate_lines
+        return aiter_validate_lines(self, reader, skip_valid, errors_only,
+                                    max_errors, executor, inline_size)
+
+    def validate_many(self, iterable, workers=None, chunksize=100,
+                      ordered=True):
+        """Validate many payloads in a pool of processes.
+
+        Payloads are sent by chunks of `chunksize` to `workers` processes
+        (cpu count by default), the validator is sent once per process.
+        Yields `(res, errors)` of each payload, in the same order of
+        iterable unless `ordered` is False.
+
+        Validators that can not be pickled, like ones with lambda defaults,
+        validate in the current process instead, a RuntimeWarning is shown.
+        Use module level functions as defaults to avoid this.
+        """
+        return validate_many(self, iterable, workers, chunksize, ordered)
+
+    def iter_validate_lines(self, fileobj, chunk_size=CHUNK_SIZE,
+                            skip_valid=False, errors_only=False,
+                            max_errors=None):
+        """Validate each line of a newline delimited json file.
+
+        The file is read by chunks of `chunk_size`, so memory does not grow
+        with its size. Yields `(line_no, res, errors)` of each non blank
+        line, numbered from 1. Valid lines are not yielded when
+        `skip_valid`, `res` is None when `errors_only` and it stops after
+        `max_errors` invalid lines.
+        """
+        return iter_validate_lines(self, fileobj, chunk_size, skip_valid,
+                                   errors_only, max_errors)
+
+    def iter_validate_array(self, fileobj, key=None, chunk_size=CHUNK_SIZE):
+        """Validate the items of a json array file one by one.
+
+        The file is decoded incrementally, so memory use is about one item.
+        Without `key` the file is a top level array of objects, each one
+        validated with the constrain, yields `(index, res, errors)`.
+
+        With `key` the file is an object and the items of its `key` array
+        are validated with the `items` rule of `key`, yields
+        `(index, res, error)` where res and error are the ones of the item
+        inside the list results, None when there is not any. Other
+        properties are not validated.
+
+        A payload error is yielded with a None index if the file is not
+        valid json or not the expected structure.
+        """
+        return iter_validate_array(self, fileobj, key, chunk_size)
+
+    def stats(self, reset=False):
+        """Return the profiling stats of validations, as plain dicts.
+
+        Has `validations` and `seconds`, `rules` and `fields` with `count`
+        and `seconds` of each rule kind and field, `*` for list items, and
+        `errors` with the count of each field. Seconds of a field are the
+        ones of its rules, without its children. With `reset` stats start
+        again from zero. Only `validate` is profiled, and only in the
+        current process.
+        """
+        if self._stats is None:
+            raise AttributeError('profile is not enabled')
+        stats = self._stats
+        if reset:
+            self._stats = Stats()
+        return stats.snapshot()
+
+    def _profile(self, data, schema=None):
+        """Validate data recording stats."""
+        stats = Stats()
+        result = interpret_profiled(data, schema or self.schema, self.lazy,
+                                    stats)
+        self._stats.merge(stats)
+        if callable(self.profile):
+            self.profile(stats.snapshot())
+        return result
+
+    def validate_columns(self, records, buffers='list'):
+        """Validate a list of flat records, returning columns.
+
+        Returns `(columns, errors)`, columns is a dict of the values of each
+        property in the valid records, in order. Errors of invalid records
+        are keyed by their index, with the errors `validate` gives.
+
+        Each property is checked for all records at once when possible,
+        only properties with a bad value, a missing key, a datetime or a
+        container are validated record by record. Values of fields that
+        `validate` leaves out of results, like empty lists, are None.
+        Columns are lists, or with `buffers='array'` or `'numpy'` int and
+        float columns are `array.array` or numpy arrays.
+        """
+        if buffers not in BUFFERS:
+            raise AttributeError('buffers must be one of {}'.format(
+                ', '.join(BUFFERS)))
+        records, err = self._convert(records, self.loads)
 
-            if not isinstance(obj, (rules.get('type', str),
-                                    rules.get('type', unicode))):
-                if self.special_types(obj, rules, key, err_field, res, errors):
-                    if errors and self.lazy:
-                        return
-                else:
-                    errors[err_field] = rules.get(
-                        'type_error', 'Bad data type')
-                    if self.lazy:
-                        return
-
-            elif self._extra_validations(obj, rules, errors, field):
-                if self.lazy:
-                    return
-
-            elif isinstance(obj, dict):
-                res[key] = {}
-                errors[key] = {}
-                stack.append((res[key], errors[key], field, obj,
-                              rules.get('properties', None)))
-
-            elif isinstance(obj, list):
-                res[key] = []
-                errors[key] = []
-                my_field2 = field
-                for ind, item in enumerate(obj):
-                    field = my_field2
-                    field += '.{}'.format(ind)
-                    res[key].append(None)
-                    errors[key].append(None)
-
-                    matcheds.append((item, rules.get('items', {}), ind, field,
-                                     res[key], errors[key]))
-
-            else:
-                res[key] = obj
-
-        return res, errors
+        if err and err in ('1', '2'):
+            return self._payload_error(err)
+        if not isinstance(records, list):
+            return self._payload_error('2')
+
+        return validate_columns(self, records, buffers)
+
+    def _interpret(self, data, schema=None):
+        """Walk the compiled schema over data."""
+        schema = schema or self.schema
+        if self._plain_errors:
+            walker = Walker(self.lazy)
+        else:
+            walker = ErrorsWalker(self.lazy, self.errors == 'object',
+                                  self.max_errors)
+        root = Frame(None, None, schema, data, {},
+                     iter(schema.properties or ()), False)
+        walker.walk(root)
+        return root.res, root.errors or {}
+
+    def _interpret_input(self, data, schema=None, copy=True):
+        """Walk the compiled schema over data, returning data as result.
+
+        Only changed values are collected, then set into data or into
+        copies of its containers when `copy`.
+        """
+        schema = schema or self.schema
+        root = ChangesFrame(None, None, schema, data, Changes(),
+                            iter(schema.properties or ()), False)
+        ChangesWalker(self.lazy).walk(root)
+        return apply_changes(data, root.res, copy), root.errors or {}
+
+    def _first_error(self, data, schema=None):
+        """Walk the compiled schema over data until the first error."""
+        schema = schema or self.schema
+        walker = FirstErrorWalker()
+        walker.walk(ChangesFrame(None, None, schema, data, Changes(),
+                                 iter(schema.properties or ()), False))
+        return walker.first
+
+    def _interpret_item(self, node, index, key, item):
+        """Validate an item of the `key` list with its node.
+
+        Returns the item result and error, None when there is not any,
+        the same they are inside the results of its list.
+        """
+        parent = Frame(None, None, None, None, None, None, False)
+        frame = Frame(parent, key, node, [item], [],
+                      iter(((index, item),)), True)
+        Walker(self.lazy).walk(frame)
+        return (frame.res[0] if frame.res else None,
+                frame.errors[0] if frame.errors else None)
 
     @staticmethod
     def clean_data(_error, _key=None, _parent=None):
@@ -151,12 +553,14 @@ class JsonValidator:
                     stack.append((error, key, parent, False))
                     for _key in error:
                         stack.append((error[_key], _key, error, True))
+                    continue
 
             elif isinstance(error, list):
                 if repeat:
                     stack.append((error, key, parent, False))
                     for aux, item in enumerate(error):
                         stack.append((item, aux, error, True))
+                    continue
 
             if not error and parent:
                 if isinstance(parent, dict):
@@ -167,57 +571,57 @@ class JsonValidator:
 
     @staticmethod
     def special_types(obj, rules, key, field, res, errors):
-        """Validate if special type retrieved."""
-        if rules.get('type', str) == datetime:
-            if rules.get('dformat', False):
-                try:
-                    res[key] = datetime.strptime(obj, rules['dformat'])
-                except ValueError:
-                    errors[field] = rules.get(
-                        'dformat_error', 'Invalid format')
-            else:
-                raise AttributeError('Missing `dformat` on datetime rule')
-            return True
-        return False
+        """Validate if special type retrieved.
+
+        Not used by validations anymore, which parse datetimes of the
+        compiled schema.
+        """
+        if rules.get('type', str) != datetime:
+            return False
+        if not rules.get('dformat', False):
+            raise AttributeError('Missing `dformat` on datetime rule')
+        try:
+            res[key] = DateParser(rules['dformat'])(obj)
+        except ValueError:
+            errors[field] = rules.get('dformat_error', 'Invalid format')
+        return True
+
+    def _decode(self, data, lazy):
+        """Decode str and bytes payloads guided by the constrain.
+
+        Like `_convert`, lazy stops decoding at the first error. Binary
+        payloads, also python 2 str, are decoded to text first.
+        """
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            try:
+                data = decode_binary(data)
+            except ValueError:
+                return (False, '1')
+        elif not isinstance(data, (str, unicode)):
+            return self._convert(data, self.loads)
 
-    @staticmethod
-    def _extra_validations(data, rules, errors, field):
-        """Extras validations."""
-        if isinstance(data, (int, float)):
-            if rules.get('gt', False) and not data > rules['gt']:
-                errors[field] = rules.get(
-                    'gt_error', 'Not greater than {limit}').format(
-                        value=data, limit=rules['gt'])
-                return True
-
-            elif rules.get('lt', False) and not data < rules['lt']:
-                errors[field] = rules.get(
-                    'lt_error', 'Not less than {limit}').format(
-                        value=data, limit=rules['lt'])
-                return True
-
-        if rules.get('format', False):
-            if not match(rules['format'], data):
-                errors[field] = rules.get(
-                    'format_error', 'Invalid format')
-                return True
-
-        if rules.get('in', False):
-            if data not in rules['in']:
-                errors[field] = rules.get('in_error', 'Invalid')
-                return True
-
-        return False
+        try:
+            return (self._decoder.decode(data, lazy), False)
+        except ValueError:
+            return (False, '1')
 
     @staticmethod
-    def _convert(data):
-        """Check if given data is a string, and loads it."""
-        if isinstance(data, (str, dict, list)):
-            if isinstance(data, (str, unicode)):
+    def _convert(data, loads=json_loads):
+        """Check if given data is a string or bytes, and loads it.
+
+        Binary payloads `json.loads` doesn't take, like memoryviews, are
+        decoded first if loads is the standard one.
+        """
+        if isinstance(data, (dict, list)):
+            return (data, False)
+        if isinstance(data, (str, unicode, bytes, bytearray, memoryview)):
+            if isinstance(data, BINARY) and loads is json_loads:
                 try:
-                    return (loads(data), False)
-                except JSONDecodeError:
+                    data = decode_binary(data)
+                except ValueError:
                     return (False, '1')
-            else:
-                return (data, False)
+            try:
+                return (loads(data), False)
+            except ValueError:
+                return (False, '1')
         return (False, '2')
@@ -0,0 +1,96 @@
+"""Asyncio validation, python 3.6+ only.
+
+Imported by `JsonValidator` methods when used, so the package keeps working
+on older pythons.
+"""
+# -*- coding: utf-8 -*-
+
+import asyncio
+
+# Payloads up to this size, in bytes, are validated in the loop.
+INLINE_SIZE = 64 * 1024
+
+# Seconds of validations in the loop before letting other tasks run.
+TIME_SLICE = 0.005
+
+
+def payload_size(data):
+    """Return the size of a json payload, None if it is already decoded."""
+    if isinstance(data, memoryview):
+        return data.nbytes
+    if isinstance(data, (str, bytes, bytearray)):
+        return len(data)
+    return None
+
+
+async def validate_async(validator, data, executor=None, inline_size=None):
+    """Validate data in the loop or in an executor, by its size.
+
+    See `JsonValidator.validate_async`.
+    """
+    if inline_size is None:
+        inline_size = INLINE_SIZE
+    size = payload_size(data)
+    if size is not None and size <= inline_size:
+        return validator.validate(data)
+
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(executor, validator.validate, data)
+
+
+async def read_line(reader):
+    """Return the next line of a stream reader, b'' at its end.
+
+    Lines longer than the reader limit are read in pieces.
+    """
+    pieces = []
+    while True:
+        try:
+            pieces.append(await reader.readuntil(b'\n'))
+            break
+        except asyncio.IncompleteReadError as err:
+            pieces.append(err.partial)
+            break
+        except asyncio.LimitOverrunError as err:
+            pieces.append(await reader.readexactly(err.consumed))
+    return b''.join(pieces)
+
+
+async def aiter_validate_lines(validator, reader, skip_valid=False,
+                               errors_only=False, max_errors=None,
+                               executor=None, inline_size=None):
+    """Yield `(line_no, res, errors)` of each line of a json lines stream.
+
+    See `JsonValidator.aiter_validate_lines`.
+    """
+    loop = asyncio.get_event_loop()
+    invalid = 0
+    line_no = 0
+    started = loop.time()
+
+    while True:
+        line = await read_line(reader)
+        if not line:
+            return
+        line_no += 1
+        if not line.strip():
+            continue
+
+        res, errors = await validate_async(validator, line, executor,
+                                           inline_size)
+
+        # Lines already buffered are read without suspending, let other
+        # tasks run from time to time.
+        if loop.time() - started >= TIME_SLICE:
+            await asyncio.sleep(0)
+            started = loop.time()
+
+        if errors:
+            invalid += 1
+        elif skip_valid:
+            continue
+
+        yield line_no, None if errors_only else res, errors
+
+        if max_errors is not None and invalid >= max_errors:
+            return
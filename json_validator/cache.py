@@ -0,0 +1,113 @@
+"""Cache of validation results of repeated payloads."""
+# -*- coding: utf-8 -*-
+
+import pickle
+from collections import OrderedDict
+from threading import Lock
+
+from .schema import STRINGS
+
+# Payloads that are cached, mutable ones are not.
+PAYLOADS = STRINGS + (bytes,)
+
+
+def calls_defaults(schema):
+    """Check if some node of the schema has a callable default."""
+    stack = [schema]
+    seen = set()
+    while stack:
+        node = stack.pop()
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        if node.call_default:
+            return True
+        stack.extend(child for _, child in node.properties or ())
+        if node.items is not None:
+            stack.append(node.items)
+    return False
+
+
+class ResultCache(object):
+    """Least recently used results of str and bytes payloads.
+
+    Payloads are the keys, so a hit is an identical payload. Results are
+    kept pickled and loaded again on each hit, callers can change them.
+    At most `size` results are kept, taking at most `memory` bytes with
+    their payloads when given. Results that can't be pickled are not kept.
+    """
+
+    def __init__(self, size, memory=None):
+        """Set the bounds of the cache."""
+        self.size = size
+        self.memory = memory
+        self.used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._results = OrderedDict()
+        self._lock = Lock()
+
+    def __getstate__(self):
+        """Return the bounds, results are not pickled."""
+        return {'size': self.size, 'memory': self.memory}
+
+    def __setstate__(self, state):
+        """Create an empty cache with the same bounds."""
+        self.__init__(state['size'], state['memory'])
+
+    def __len__(self):
+        """Return the number of cached results."""
+        return len(self._results)
+
+    def validate(self, payload, validate):
+        """Return the cached result of payload, validating it if missing."""
+        if not isinstance(payload, PAYLOADS):
+            return validate(payload)
+
+        with self._lock:
+            dump = self._results.pop(payload, None)
+            if dump is not None:
+                self._results[payload] = dump
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        if dump is not None:
+            return pickle.loads(dump)
+        result = validate(payload)
+        self._add(payload, result)
+        return result
+
+    def _add(self, payload, result):
+        """Add the result of payload, dropping least recently used ones."""
+        try:
+            dump = pickle.dumps(result, pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return
+        weight = len(payload) + len(dump)
+        if self.memory is not None and weight > self.memory:
+            return
+
+        with self._lock:
+            if payload in self._results:
+                return
+            self._results[payload] = dump
+            self.used += weight
+            while len(self._results) > self.size or (
+                    self.memory is not None and self.used > self.memory):
+                dropped, dump = self._results.popitem(last=False)
+                self.used -= len(dropped) + len(dump)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop all results, counters are kept."""
+        with self._lock:
+            self._results.clear()
+            self.used = 0
+
+    def stats(self):
+        """Return a dict of the counters and the use of the cache."""
+        return {'hits': self.hits, 'misses': self.misses,
+                'evictions': self.evictions, 'results': len(self._results),
+                'used': self.used}
@@ -0,0 +1,414 @@
+"""Python code generation of compiled constrains."""
+# -*- coding: utf-8 -*-
+
+import linecache
+import marshal
+from functools import partial
+from itertools import count
+from types import FunctionType
+from weakref import ref
+
+from .schema import NUMBERS, STRINGS, batch_valid, error_key
+
+LITERALS = STRINGS + (int, float, bool, type(None))
+
+# Types whose values can be looked up in the members of `in` rules.
+HASHABLE = STRINGS + (bytes, int, float, bool, type(None))
+
+_FILENAMES = count()
+
+# Weak references to generated functions by the filename of their code,
+# their source is removed from linecache when they are collected.
+_FUNCTIONS = {}
+
+
+def _is_literal(value):
+    """Check the value can be written as a python literal."""
+    return type(value) in LITERALS
+
+
+def _accepts(types, container):
+    """Check if a container instance may pass the isinstance of types."""
+    stack = list(types)
+    while stack:
+        _type = stack.pop()
+        if isinstance(_type, tuple):
+            stack.extend(_type)
+        elif isinstance(_type, type) and (issubclass(_type, container) or
+                                          issubclass(container, _type)):
+            return True
+    return False
+
+
+def _err_key(key):
+    """Return the error key of a field if it is a number, None otherwise."""
+    key = error_key(None, key)
+    return key if isinstance(key, int) else None
+
+
+class Scope(object):
+    """Variables of the results and errors of a container.
+
+    Errors start as None and are created, with the ones of their parents,
+    when an error is found. Results are added to the parent when the
+    container is finished, if not empty.
+    """
+
+    __slots__ = ('res', 'errors', 'parent', 'key', 'is_list')
+
+    def __init__(self, res, errors, parent=None, key=None, is_list=False):
+        """Set variable names and the key expression inside of parent."""
+        self.res = res
+        self.errors = errors
+        self.parent = parent
+        self.key = key
+        self.is_list = is_list
+
+    def add(self, container, key, value):
+        """Return statement adding value to a container of this scope."""
+        if self.is_list:
+            return '{}.append({})'.format(container, value)
+        return '{}[{}] = {}'.format(container, key, value)
+
+    def chain(self):
+        """Return this scope and its ancestors, except the root one."""
+        scopes = []
+        scope = self
+        while scope.parent is not None:
+            scopes.append(scope)
+            scope = scope.parent
+        return scopes
+
+
+class CodeGenerator(object):
+    """Generate the source of a validation function for a compiled schema.
+
+    The function is generated without recursion, a stack of pending lines
+    and pending nodes is used instead.
+
+    With `check_only` the function builds neither results nor errors, it
+    returns the `(field, message)` of the first error or None.
+    """
+
+    def __init__(self, schema, lazy=False, name='validate',
+                 check_only=False):
+        """Set the schema to generate."""
+        self.schema = schema
+        self.lazy = lazy
+        self.name = name
+        self.check_only = check_only
+        self.namespace = {
+            'NUMBERS': NUMBERS, 'batch_valid': batch_valid}
+        self._constants = {}
+        self._names = count()
+
+    def constant(self, value):
+        """Bind value into the namespace and return its name."""
+        key = id(value)
+        if key not in self._constants:
+            name = 'c{}'.format(next(self._names))
+            self._constants[key] = (name, value)
+            self.namespace[name] = value
+        return self._constants[key][0]
+
+    def literal(self, value):
+        """Return a python expression of value."""
+        if _is_literal(value):
+            return repr(value)
+        return self.constant(value)
+
+    def variable(self, prefix):
+        """Return an unique variable name."""
+        return '{}{}'.format(prefix, next(self._names))
+
+    @staticmethod
+    def field(parts):
+        """Return expression of the dotted field path of given parts.
+
+        Parts are static keys or `(name,)` tuples of index variables.
+        """
+        if all(not isinstance(part, tuple) for part in parts):
+            return repr('.'.join(parts))
+        template = '.'.join(
+            '{}' if isinstance(part, tuple) else
+            part.replace('{', '{{').replace('}', '}}') for part in parts)
+        return '{!r}.format({})'.format(template, ', '.join(
+            part[0] for part in parts if isinstance(part, tuple)))
+
+    def generate(self):
+        """Return the source of the validation function."""
+        lines = ['def {}(data):'.format(self.name)]
+        if self.check_only:
+            stack = [('line', 1, 'return None')]
+        else:
+            lines.extend(['    res = {}', '    errors = {}'])
+            stack = [('line', 1, 'return res, errors')]
+        if self.schema.properties:
+            stack.append(('props', 1, self.schema, 'data',
+                          None if self.check_only else
+                          Scope('res', 'errors'), ()))
+
+        while stack:
+            task = stack.pop()
+            if task[0] == 'line':
+                lines.append('    ' * task[1] + task[2])
+                continue
+
+            method = self._props if task[0] == 'props' else self._value
+            stack.extend(reversed(method(*task[1:])))
+
+        return '\n'.join(lines) + '\n'
+
+    def _set(self, scope, key, value):
+        """Return statement adding a value to the results of scope."""
+        if self.check_only:
+            return 'pass'
+        return scope.add(scope.res, key, value)
+
+    def _fail(self, indent, scope, key, message, parts):
+        """Return lines recording an error, creating error containers."""
+        if self.check_only:
+            return [('line', indent, 'return {}, {}'.format(
+                self.field(parts), message))]
+
+        chain = scope.chain()
+        lines = []
+        for ind, _scope in enumerate(chain):
+            lines.append(('line', indent + ind, 'if {} is None:'.format(
+                _scope.errors)))
+            lines.append(('line', indent + ind + 1, '{} = {}'.format(
+                _scope.errors, '[]' if _scope.is_list else '{}')))
+        for ind in reversed(range(len(chain))):
+            _scope = chain[ind]
+            lines.append(('line', indent + ind + 1, _scope.parent.add(
+                _scope.parent.errors, _scope.key, _scope.errors)))
+
+        lines.append(('line', indent, scope.add(scope.errors, key, message)))
+        if self.lazy:
+            for _scope in chain:
+                lines.append(('line', indent, 'if {}:'.format(_scope.res)))
+                lines.append(('line', indent + 1, _scope.parent.add(
+                    _scope.parent.res, _scope.key, _scope.res)))
+            lines.append(('line', indent, 'return res, errors'))
+        return lines
+
+    def _props(self, indent, node, data, scope, parts):
+        """Return pending lines validating the properties of a dict."""
+        tasks = []
+        for key, child in node.properties:
+            value = self.variable('v')
+            literal = self.literal(key)
+            tasks.append(('line', indent, 'if {} in {}:'.format(
+                literal, data)))
+            tasks.append(('line', indent + 1, '{} = {}[{}]'.format(
+                value, data, literal)))
+
+            field = parts + (key,)
+            err_key = _err_key(key)
+            err_key = self.field(field) if err_key is None else repr(err_key)
+            tasks.append(('value', indent + 1, child, value, scope, literal,
+                          err_key, field))
+
+            tasks.append(('line', indent, 'else:'))
+            if child.has_default:
+                default = self.literal(child.default)
+                if child.call_default:
+                    default += '()'
+                tasks.append(('line', indent + 1, self._set(
+                    scope, literal, default)))
+            else:
+                tasks.extend(self._fail(indent + 1, scope, self.field(field),
+                                        self.literal(child.error), field))
+        return tasks
+
+    def _check(self, check, value, types):
+        """Return condition and message expressions of a failing check.
+
+        Values of types are the ones passing the type check.
+        """
+        limit = self.literal(check.limit)
+        message = self.literal(check.message)
+        if check.kind in ('gt', 'lt'):
+            operator = '>' if check.kind == 'gt' else '<'
+            return ('isinstance({0}, NUMBERS) and not {0} {1} {2}'.format(
+                value, operator, limit),
+                    '{}.format(value={}, limit={})'.format(
+                        message, value, limit))
+        if check.kind == 'format':
+            # The pattern, its bound match can't be pickled on python 2.
+            pattern = self.constant(check.pattern)
+            return 'not {}.match({})'.format(pattern, value), message
+        if check.kind == 'in' and not check.others and all(
+                _type in HASHABLE for _type in types):
+            return '{} not in {}'.format(
+                value, self.constant(check.members)), message
+
+        check = self.constant(check)
+        return ('{}({}) is not None'.format(check, value),
+                '{}({})'.format(check, value))
+
+    def _value(self, indent, node, value, scope, key, err_key, parts):
+        """Return pending lines validating a value with its node."""
+        tasks = [('line', indent, 'if isinstance({}, {}):'.format(
+            value, self.literal(node.types)))]
+
+        # Errors of checks are keyed by their dotted field, see
+        # `Frame.add_error`.
+        check_key = err_key
+        if scope is not None and not scope.is_list:
+            check_key = self.field(parts)
+        branches = []
+        for check in node.checks:
+            condition, message = self._check(check, value, node.types)
+            branches.append((condition, self._fail(
+                indent + 2, scope, check_key, message, parts)))
+
+        if _accepts(node.types, dict):
+            branches.append(('isinstance({}, dict)'.format(value),
+                             self._dict(indent + 2, node, value, scope, key,
+                                        parts)))
+        if _accepts(node.types, list):
+            branches.append(('isinstance({}, list)'.format(value),
+                             self._list(indent + 2, node, value, scope, key,
+                                        parts)))
+
+        assign = self._set(scope, key, value)
+        if branches:
+            for ind, (condition, lines) in enumerate(branches):
+                tasks.append(('line', indent + 1, '{} {}:'.format(
+                    'elif' if ind else 'if', condition)))
+                tasks.extend(lines)
+            tasks.append(('line', indent + 1, 'else:'))
+            tasks.append(('line', indent + 2, assign))
+        else:
+            tasks.append(('line', indent + 1, assign))
+
+        tasks.append(('line', indent, 'else:'))
+        if not node.is_datetime:
+            tasks.extend(self._fail(indent + 1, scope, err_key,
+                                    self.literal(node.type_error), parts))
+        elif node.dformat is None:
+            tasks.append(('line', indent + 1, "raise AttributeError("
+                          "'Missing `dformat` on datetime rule')"))
+        else:
+            parsed = self.variable('v')
+            tasks.append(('line', indent + 1, 'try:'))
+            tasks.append(('line', indent + 2,
+                          '{} = {}({})'.format(
+                              parsed, self.constant(node.parse_date),
+                              value)))
+            tasks.append(('line', indent + 1, 'except ValueError:'))
+            tasks.extend(self._fail(indent + 2, scope, err_key,
+                                    self.literal(node.dformat_error), parts))
+            tasks.append(('line', indent + 1, 'else:'))
+            tasks.append(('line', indent + 2, self._set(scope, key, parsed)))
+        return tasks
+
+    def _dict(self, indent, node, value, scope, key, parts):
+        """Return pending lines validating a dict value."""
+        if not node.properties:
+            return [('line', indent, 'pass')]
+        if self.check_only:
+            return [('props', indent, node, value, None, parts)]
+        child = Scope(self.variable('r'), self.variable('e'), scope, key)
+        return [
+            ('line', indent, '{} = {{}}'.format(child.res)),
+            ('line', indent, '{} = None'.format(child.errors)),
+            ('props', indent, node, value, child, parts),
+            ('line', indent, 'if {}:'.format(child.res)),
+            ('line', indent + 1, scope.add(scope.res, key, child.res))]
+
+    def _list(self, indent, node, value, scope, key, parts):
+        """Return pending lines validating a list value."""
+        tasks = self._walk_list(indent, node, value, scope, key, parts)
+        if node.items.batch_types is None:
+            return tasks
+        return [
+            ('line', indent, 'if {0} and batch_valid({1}, {0}):'.format(
+                value, self.constant(node.items))),
+            ('line', indent + 1, self._set(scope, key, value + '[:]')),
+            ('line', indent, 'else:')] + [
+                (task[0], task[1] + 1) + task[2:] for task in tasks]
+
+    def _walk_list(self, indent, node, value, scope, key, parts):
+        """Return pending lines validating the items of a list one by one."""
+        ind, item = self.variable('i'), self.variable('v')
+        if self.check_only:
+            return [
+                ('line', indent, 'for {}, {} in enumerate({}):'.format(
+                    ind, item, value)),
+                ('value', indent + 1, node.items, item, None, ind, ind,
+                 parts + ((ind,),))]
+
+        child = Scope(self.variable('r'), self.variable('e'), scope, key,
+                      True)
+        return [
+            ('line', indent, '{} = []'.format(child.res)),
+            ('line', indent, '{} = None'.format(child.errors)),
+            ('line', indent, 'for {}, {} in enumerate({}):'.format(
+                ind, item, value)),
+            ('value', indent + 1, node.items, item, child, ind, ind,
+             parts + ((ind,),)),
+            ('line', indent, 'if {}:'.format(child.res)),
+            ('line', indent + 1, scope.add(scope.res, key, child.res))]
+
+    def build(self):
+        """Generate, compile and return the validation function."""
+        source = self.generate()
+        filename = '<json_validator-codegen-{}>'.format(next(_FILENAMES))
+        code = compile(source, filename, 'exec')
+        namespace = dict(self.namespace)
+        exec(code, namespace)
+        function = namespace.pop(self.name)
+        function.source = source
+        _register(filename, function)
+        return function
+
+
+def _register(filename, function):
+    """Register the source of function in linecache while it is alive.
+
+    Tracebacks of generated code show its lines then.
+    """
+    source = function.source
+    linecache.cache[filename] = (
+        len(source), None, source.splitlines(True), filename)
+    _FUNCTIONS[filename] = ref(function, partial(_unregister, filename))
+
+
+def _unregister(filename, _):
+    """Remove the source of a collected function from linecache."""
+    linecache.cache.pop(filename, None)
+    _FUNCTIONS.pop(filename, None)
+
+
+def dump_function(function):
+    """Return `(name, code, source, namespace)` of a generated function.
+
+    Code is marshaled, so it can only be loaded by the same python version.
+    The namespace has to be pickled with the schema of the function.
+    """
+    name = function.__name__
+    namespace = dict((key, value)
+                     for key, value in function.__globals__.items()
+                     if key not in ('__builtins__', name))
+    return name, marshal.dumps(function.__code__), function.source, namespace
+
+
+def load_function(name, code, source, namespace):
+    """Return a generated function from the values of `dump_function`."""
+    code = marshal.loads(code)
+    namespace = dict(namespace, __builtins__=__builtins__)
+    function = FunctionType(code, namespace, name)
+    function.source = source
+    _register(code.co_filename, function)
+    return function
+
+
+def build(schema, lazy=False, check_only=False):
+    """Return the generated validation function of a compiled schema.
+
+    The generated source is available on the function `source` attribute.
+    """
+    name = 'first_error' if check_only else 'validate'
+    return CodeGenerator(schema, lazy, name, check_only).build()
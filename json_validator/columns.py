@@ -0,0 +1,146 @@
+"""Validation of lists of records into columns."""
+# -*- coding: utf-8 -*-
+
+from array import array
+from operator import itemgetter
+
+from .schema import NUMBERS, STRINGS, Node, batch_valid
+
+BUFFERS = ('list', 'array', 'numpy')
+
+try:
+    array('q')
+    INT_TYPECODE = 'q'
+except ValueError:
+    # Python 2 has no long long arrays, longs have 64 bits on most systems.
+    INT_TYPECODE = 'l'
+
+# Array typecodes and numpy dtypes of number columns.
+TYPECODES = {int: INT_TYPECODE, float: 'd'}
+DTYPES = {int: 'int64', float: 'float64'}
+
+TEXT = frozenset(STRINGS)
+
+
+def exact_types(node):
+    """Return the exact types of values node accepts at once, or None.
+
+    None means values must be walked, like containers and datetimes.
+    """
+    if node.is_datetime:
+        return None
+    types = set()
+    stack = list(node.types)
+    while stack:
+        _type = stack.pop()
+        if isinstance(_type, tuple):
+            stack.extend(_type)
+        elif not isinstance(_type, type) or issubclass(_type, (dict, list)):
+            return None
+        else:
+            types.add(_type)
+    return types
+
+
+def column_valid(node, values):
+    """Check at once that all values of a column are valid for node.
+
+    False means some value may be invalid, values must be checked one by
+    one to know which.
+    """
+    if node.batch_types is not None:
+        return batch_valid(node, values)
+
+    types = exact_types(node)
+    if types is None or not types.issuperset(map(type, values)):
+        return False
+    for check in node.checks:
+        if check.kind == 'format' and types <= TEXT:
+            if not all(map(check.pattern.match, values)):
+                return False
+        elif check.kind == 'in':
+            try:
+                if check.others or not all(map(check.members.__contains__,
+                                               values)):
+                    return False
+            except TypeError:
+                return False
+        elif check.kind not in ('gt', 'lt') or any(
+                issubclass(_type, NUMBERS) for _type in types):
+            return False
+    return True
+
+
+def to_buffer(values, node, buffers):
+    """Return the column buffer of values.
+
+    Number columns are packed into `array.array` or numpy arrays, other
+    columns, or ones with values of other types, are kept as lists.
+    """
+    _type = node.types[0]
+    if buffers == 'list' or _type not in TYPECODES or not {
+            _type}.issuperset(map(type, values)):
+        return values
+    try:
+        if buffers == 'array':
+            return array(TYPECODES[_type], values)
+        import numpy
+        return numpy.array(values, dtype=DTYPES[_type])
+    except OverflowError:
+        return values
+
+
+def validate_columns(validator, records, buffers='list'):
+    """Validate a list of records returning columns of the valid ones.
+
+    See `JsonValidator.validate_columns`.
+    """
+    schema = validator.schema
+    properties = schema.properties or ()
+    errors = {}
+
+    indexes = range(len(records))
+    if not {dict}.issuperset(map(type, records)):
+        indexes = [index for index, record in enumerate(records)
+                   if isinstance(record, dict)]
+        for index in set(range(len(records))).difference(indexes):
+            errors[index] = validator._payload_error('2')[1]
+        records = [records[index] for index in indexes]
+
+    # Columns valid at once are kept as they are, the other ones are
+    # validated row by row.
+    columns = {}
+    slow = []
+    for key, node in properties:
+        try:
+            values = list(map(itemgetter(key), records))
+        except KeyError:
+            slow.append((key, node))
+            continue
+        if values and column_valid(node, values):
+            columns[key] = values
+        else:
+            slow.append((key, node))
+
+    if slow:
+        node = Node({'type': dict})
+        node.properties = tuple(slow)
+        results = []
+        for index, record in zip(indexes, records):
+            res, _errors = validator._interpret(record, node)
+            if _errors:
+                errors[index] = _errors
+            results.append(res)
+        for key, _ in slow:
+            # Fields `validate` leaves out of valid results are None.
+            columns[key] = [res.get(key) for res in results]
+
+    if errors:
+        valid = [row for row, index in enumerate(indexes)
+                 if index not in errors]
+        for key in columns:
+            values = columns[key]
+            columns[key] = [values[row] for row in valid]
+
+    return ({key: to_buffer(columns[key], node, buffers)
+             for key, node in properties}, errors)
@@ -0,0 +1,195 @@
+"""Decoding of json payloads guided by a compiled schema."""
+# -*- coding: utf-8 -*-
+
+from json import JSONDecoder
+from json.decoder import scanstring
+from re import compile as re_compile
+
+from .schema import Changes, ChangesFrame
+from .walker import FirstErrorWalker
+
+DECODER = JSONDecoder()
+WHITESPACE = re_compile(r'[ \t\n\r]*')
+# Keys without escapes, with the whitespaces and colon around them.
+KEY = re_compile(r'[ \t\n\r]*"([^"\\\x00-\x1f]*)"'
+                 r'[ \t\n\r]*:[ \t\n\r]*').match
+
+
+def invalid(node, value):
+    """Check if a decoded value fails the rules of its node.
+
+    Only the value is checked, not the items or properties of containers.
+    """
+    walker = FirstErrorWalker()
+    frame = ChangesFrame(None, None, None, None, Changes(), None, False)
+    try:
+        walker.match(frame, node, None, value)
+    except (AttributeError, ValueError, TypeError):
+        return True
+    return walker.first is not None
+
+
+class SchemaDecoder(object):
+    """Decode json objects with the properties of a compiled schema.
+
+    Values of keys that are not properties are scanned and dropped, they
+    are never kept in the decoded object. Objects with properties are
+    decoded key by key, other values at once by the json scanner.
+    """
+
+    def __init__(self, schema):
+        """Index the properties of the nodes of schema."""
+        self.schema = schema
+        nodes = []
+        stack = [schema]
+        seen = set()
+        while stack:
+            node = stack.pop()
+            if id(node) in seen:
+                continue
+            seen.add(id(node))
+            nodes.append(node)
+            stack.extend(child for _, child in node.properties or ())
+            if node.items is not None:
+                stack.append(node.items)
+
+        # Properties of guided objects, `(index, node)` by key and the keys
+        # in order, by id of their node.
+        self.fields = dict(
+            (id(node), (dict((key, (index, child)) for index, (key, child)
+                             in enumerate(node.properties)),
+                        tuple(key for key, _ in node.properties)))
+            for node in nodes
+            if node.properties and not node.checks and
+            isinstance({}, node.types))
+        # Ids of the nodes of lists whose items are guided objects.
+        self.lists = set(
+            id(node) for node in nodes
+            if node.items is not None and id(node.items) in self.fields and
+            not node.checks and isinstance([], node.types))
+
+    def decode(self, text, lazy=False):
+        """Return the object of a json text, raise ValueError if invalid.
+
+        Texts that are not objects are decoded as they are. With `lazy`
+        decoding stops at the first invalid value, or object missing a
+        property, when all the properties before it in the order of the
+        schema are already decoded, the object decoded so far is returned.
+        Validating it lazily gives the same first error as the whole text.
+        """
+        whitespace = WHITESPACE.match
+        raw_decode = DECODER.raw_decode
+        pos = whitespace(text).end()
+        if text[pos:pos + 1] != u'{' or id(self.schema) not in self.fields:
+            return DECODER.decode(text)
+
+        root = {}
+        # Frames are `[target, node, fields, key]`, fields is None for
+        # lists, key the one of the value being decoded.
+        stack = [[root, self.schema, self.fields[id(self.schema)], None]]
+        pos += 1
+        first = True
+
+        while True:
+            frame = stack[-1]
+            target, node, fields, key = frame
+            closer = u']' if fields is None else u'}'
+            value = None
+
+            while value is None:
+                pos = whitespace(text, pos).end()
+                char = text[pos:pos + 1]
+                if char == closer:
+                    break
+                if not first:
+                    if char != u',':
+                        raise ValueError(
+                            "Expecting ',' delimiter: char {}".format(pos))
+                    pos += 1
+                first = False
+
+                if fields is None:
+                    child = node.items
+                    pos = whitespace(text, pos).end()
+                else:
+                    match = KEY(text, pos)
+                    if match is not None:
+                        key = match.group(1)
+                        pos = match.end()
+                    else:
+                        pos = whitespace(text, pos).end()
+                        if text[pos:pos + 1] != u'"':
+                            raise ValueError(
+                                'Expecting property name: char {}'.format(
+                                    pos))
+                        key, pos = scanstring(text, pos + 1)
+                        pos = whitespace(text, pos).end()
+                        if text[pos:pos + 1] != u':':
+                            raise ValueError(
+                                "Expecting ':' delimiter: char {}".format(
+                                    pos))
+                        pos = whitespace(text, pos + 1).end()
+                    child = fields[0].get(key)
+                    if child is None:
+                        pos = raw_decode(text, pos)[1]
+                        continue
+                    child = child[1]
+                    frame[3] = key
+
+                char = text[pos:pos + 1]
+                if char == u'{' and id(child) in self.fields:
+                    value = [{}, child, self.fields[id(child)], None]
+                    item = value[0]
+                elif char == u'[' and id(child) in self.lists:
+                    value = [[], child, None, None]
+                    item = value[0]
+                else:
+                    item, pos = raw_decode(text, pos)
+
+                if fields is None:
+                    target.append(item)
+                else:
+                    target[key] = item
+                if (lazy and value is None and
+                        (child.checks or not isinstance(item, child.types))
+                        and invalid(child, item) and self.complete(stack)):
+                    return root
+
+            if value is not None:
+                stack.append(value)
+                pos += 1
+                first = True
+                continue
+
+            pos += 1
+            stack.pop()
+            if not stack:
+                pos = whitespace(text, pos).end()
+                if pos != len(text):
+                    raise ValueError('Extra data: char {}'.format(pos))
+                return root
+            if (lazy and fields is not None and self.missing(node, target)
+                    and self.complete(stack)):
+                return root
+            first = False
+
+    def missing(self, node, target):
+        """Check if an object lacks a property without default."""
+        for key, child in node.properties:
+            if key not in target and not child.has_default:
+                return True
+        return False
+
+    def complete(self, stack):
+        """Check if all properties before the decoded values are decoded.
+
+        Properties of each object of the stack before the key being decoded
+        in the order of the schema.
+        """
+        for target, _, fields, key in stack:
+            if fields is None:
+                continue
+            for name in fields[1][:fields[0][key][0]]:
+                if name not in target:
+                    return False
+        return True
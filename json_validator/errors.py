@@ -0,0 +1,114 @@
+"""Structured errors, and validations with at most some errors."""
+# -*- coding: utf-8 -*-
+
+from .schema import STOP, Frame, Slots, field, format_error
+from .walker import Walker
+
+
+class ValidationError(Slots):
+    """An error of a field, formatted only when rendered.
+
+    `code` is the rule that failed: missing, type, dformat, gt, lt, format
+    or in. `limit` is the one of the rule, the types for type errors, and
+    `value` the bad value, None when missing. `field` and `message` are
+    built when read, `str` gives the message.
+    """
+
+    __slots__ = ('code', 'path', 'key', 'template', 'limit', 'value')
+
+    def __init__(self, code, path, key, template, limit=None, value=None):
+        """Set the error of key inside of the `(parent_path, key)` path."""
+        self.code = code
+        self.path = path
+        self.key = key
+        self.template = template
+        self.limit = limit
+        self.value = value
+
+    @property
+    def field(self):
+        """Return the dotted field of the error."""
+        return field(self.path, self.key)
+
+    @property
+    def message(self):
+        """Return the message of the error."""
+        return format_error(self.code, self.template, self.limit,
+                            self.value)
+
+    def __str__(self):
+        """Return the message."""
+        return self.message
+
+    def __repr__(self):
+        """Return the code, field and message."""
+        return '<ValidationError {} {}: {}>'.format(
+            self.code, self.field, self.message)
+
+    def __eq__(self, other):
+        """Check errors are equal, by code, field, rule and value."""
+        return isinstance(other, ValidationError) and (
+            self.code, self.path, self.key, self.template, self.limit,
+            self.value) == (other.code, other.path, other.key,
+                            other.template, other.limit, other.value)
+
+    def __ne__(self, other):
+        """Check errors are not equal."""
+        return not self == other
+
+    __hash__ = None
+
+    def to_dict(self):
+        """Return the error as a dict of plain values."""
+        return {'code': self.code, 'field': self.field, 'limit': self.limit,
+                'value': self.value, 'message': self.message}
+
+
+class ErrorsWalker(Walker):
+    """Walk data with structured errors, or at most some errors.
+
+    Errors are `ValidationError` objects when `structured`, the walk ends
+    after `max_errors` errors.
+    """
+
+    def __init__(self, lazy=False, structured=False, max_errors=None):
+        """Set the kind of errors and how many end the walk."""
+        super(ErrorsWalker, self).__init__(lazy)
+        self.structured = structured
+        self.max_errors = max_errors
+        self.count = 0
+
+    def new_error(self, frame, key, code, template, limit=None, value=None):
+        """Return the error of a value of frame, an object or its message."""
+        if self.structured:
+            return ValidationError(code, frame.path, key, template, limit,
+                                   value)
+        return format_error(code, template, limit, value)
+
+    def added(self):
+        """Count an added error, return STOP if the walk must end."""
+        self.count += 1
+        if self.lazy or self.count == self.max_errors:
+            return STOP
+        return None
+
+    def missing(self, frame, key, node):
+        """Add the error of a missing key."""
+        frame.add_missing(key, self.new_error(frame, key, 'missing',
+                                              node.error))
+        return self.added()
+
+    def error(self, frame, key, code, template, limit=None, value=None,
+              check=False):
+        """Add the error of a bad value."""
+        frame.add_error(key, self.new_error(frame, key, code, template, limit,
+                                            value), check)
+        return self.added()
+
+
+def interpret(data, schema, lazy=False, structured=False, max_errors=None):
+    """Validate data like `JsonValidator._interpret`, see `ErrorsWalker`."""
+    root = Frame(None, None, schema, data, {},
+                 iter(schema.properties or ()), False)
+    ErrorsWalker(lazy, structured, max_errors).walk(root)
+    return root.res, root.errors or {}
@@ -0,0 +1,126 @@
+"""Read only lookup tables of codes, shared by schemas and processes."""
+# -*- coding: utf-8 -*-
+
+import mmap
+import os
+from array import array
+from bisect import bisect_right
+from threading import Lock
+
+from .schema import STRINGS
+
+# Tables loaded with `LookupTable.load`, by path and encoding.
+_TABLES = {}
+_TABLES_LOCK = Lock()
+
+
+class LookupTable(object):
+    """Sorted codes of a file, one per line, memory mapped.
+
+    Only the first code of each block of `BLOCK` lines is kept in memory,
+    codes are found by bisecting them and searching the block in the
+    mapped file. Pages of the file are shared by all the processes mapping
+    it. Use a table as the `in` limit of any number of rules, str and
+    bytes values are looked up.
+
+    Lines must be sorted by their bytes and unique, `write` writes such
+    files. Empty lines are ignored.
+    """
+
+    BLOCK = 64
+
+    def __init__(self, path, encoding='utf-8'):
+        """Map the file of path and index its blocks of lines."""
+        self.path = path
+        self.encoding = encoding
+        self._data = b''
+        self._keys = []
+        self._offsets = array('L')
+        self._size = 0
+
+        with open(path, 'rb') as fileobj:
+            if os.fstat(fileobj.fileno()).st_size:
+                self._data = mmap.mmap(fileobj.fileno(), 0,
+                                       access=mmap.ACCESS_READ)
+
+        data = self._data
+        size = len(data)
+        start = 0
+        last = None
+        while start < size:
+            end = data.find(b'\n', start)
+            if end == -1:
+                end = size
+            if end > start:
+                line = data[start:end]
+                if last is not None and not last < line:
+                    raise AttributeError(
+                        'lines of {} are not sorted and unique'.format(path))
+                last = line
+                if not self._size % self.BLOCK:
+                    self._keys.append(line)
+                    self._offsets.append(start)
+                self._size += 1
+            start = end + 1
+        self._offsets.append(size)
+
+    @classmethod
+    def load(cls, path, encoding='utf-8'):
+        """Return the table of path, loading it only once per process."""
+        key = (os.path.abspath(path), encoding)
+        with _TABLES_LOCK:
+            table = _TABLES.get(key)
+            if table is None:
+                table = _TABLES[key] = cls(path, encoding)
+        return table
+
+    @staticmethod
+    def write(path, codes, encoding='utf-8'):
+        """Write a file of codes, sorted and unique, for a table."""
+        lines = set()
+        for code in codes:
+            if not isinstance(code, bytes):
+                code = code.encode(encoding)
+            if b'\n' in code or not code:
+                raise AttributeError('invalid code {!r}'.format(code))
+            lines.add(code)
+        with open(path, 'wb') as fileobj:
+            for line in sorted(lines):
+                fileobj.write(line + b'\n')
+
+    def __reduce__(self):
+        """Pickle the path, tables are loaded again by processes."""
+        return _load, (type(self), self.path, self.encoding)
+
+    def __len__(self):
+        """Return the number of codes."""
+        return self._size
+
+    def __iter__(self):
+        """Yield the codes, decoded."""
+        data = self._data[self._offsets[0]:] if self._keys else b''
+        for line in data.split(b'\n'):
+            if line:
+                yield line.decode(self.encoding)
+
+    def __contains__(self, value):
+        """Check if value is a code of the table."""
+        if isinstance(value, bytes):
+            key = value
+        elif isinstance(value, STRINGS):
+            key = value.encode(self.encoding)
+        else:
+            return False
+        if not key or b'\n' in key:
+            return False
+
+        index = bisect_right(self._keys, key) - 1
+        if index < 0:
+            return False
+        block = self._data[self._offsets[index]:self._offsets[index + 1]]
+        return b'\n' + key + b'\n' in b'\n' + block + b'\n'
+
+
+def _load(cls, path, encoding):
+    """Return the table of path, `cls.load` can't be pickled on python 2."""
+    return cls.load(path, encoding)
@@ -0,0 +1,118 @@
+"""Field masks, validating only some fields of a constrain."""
+# -*- coding: utf-8 -*-
+
+from .codegen import build
+from .schema import STRINGS, Node
+
+# Selects a whole subtree in the tree of selected fields.
+WHOLE = None
+
+
+def copy_node(node):
+    """Return a shallow copy of a compiled node."""
+    copy = Node.__new__(Node)
+    for name in Node.__slots__:
+        setattr(copy, name, getattr(node, name))
+    return copy
+
+
+def split_field(schema, path):
+    """Return the keys of a field of schema, `*` for list items.
+
+    Fields are dotted strings or tuples of keys. List items are selected
+    with `*` or directly with the keys of their properties.
+    """
+    keys = path.split('.') if isinstance(path, STRINGS) else path
+    resolved = []
+    node = schema
+
+    for key in keys:
+        while True:
+            children = dict(node.properties or ())
+            if key in children:
+                node = children[key]
+                break
+            if list not in node.types:
+                raise AttributeError('unknown field {}'.format(path))
+            node = node.items
+            resolved.append('*')
+            if key == '*':
+                break
+        if key != '*':
+            resolved.append(key)
+    return tuple(resolved)
+
+
+def prune(schema, paths):
+    """Return a copy of schema with only the fields of paths.
+
+    Nodes of the fields are shared with schema, their ancestors are copies
+    with only the selected properties.
+    """
+    tree = {}
+    for path in paths:
+        keys = split_field(schema, path)
+        if not keys:
+            return schema
+        branch = tree
+        for key in keys[:-1]:
+            child = branch.setdefault(key, {})
+            if child is WHOLE:
+                break
+            branch = child
+        else:
+            branch[keys[-1]] = WHOLE
+
+    root = copy_node(schema)
+    stack = [(root, tree)]
+    while stack:
+        node, branch = stack.pop()
+        pruned = []
+        for key, child in node.properties or ():
+            if key not in branch:
+                continue
+            if branch[key] is not WHOLE:
+                child = copy_node(child)
+                stack.append((child, branch[key]))
+            pruned.append((key, child))
+        node.properties = tuple(pruned)
+
+        if '*' in branch and branch['*'] is not WHOLE:
+            node.items = copy_node(node.items)
+            stack.append((node.items, branch['*']))
+    return root
+
+
+class Mask(object):
+    """Compiled fields of a schema to validate, all others are skipped.
+
+    Only the fields, their ancestors and their children are walked,
+    checked and added to results. Missing fields that are not selected are
+    not errors. Generated functions of the codegen engine are built once
+    per mask.
+    """
+
+    def __init__(self, schema, paths):
+        """Prune schema to the fields of paths."""
+        if isinstance(paths, STRINGS):
+            raise AttributeError('paths must be a list of fields')
+        self.paths = tuple(paths)
+        self.source = schema
+        self.schema = prune(schema, self.paths)
+        self._functions = {}
+
+    def __getstate__(self):
+        """Return picklable state, generated functions are not."""
+        state = self.__dict__.copy()
+        state['_functions'] = {}
+        return state
+
+    def function(self, lazy=False):
+        """Return the generated function of the mask, None if it fails."""
+        if lazy not in self._functions:
+            try:
+                function = build(self.schema, lazy)
+            except (SyntaxError, RuntimeError, MemoryError):
+                function = None
+            self._functions[lazy] = function
+        return self._functions[lazy]
@@ -0,0 +1,136 @@
+"""Validation of many payloads in a pool of processes."""
+# -*- coding: utf-8 -*-
+
+import pickle
+import warnings
+from collections import deque
+from itertools import islice
+from multiprocessing import Pool, cpu_count
+
+try:
+    from queue import Queue
+except ImportError:
+    from Queue import Queue
+
+# Chunks sent to the pool per worker, before waiting for results.
+PREFETCH = 2
+
+_VALIDATOR = None
+
+
+def _init_worker(validator):
+    """Set the validator of the worker process."""
+    global _VALIDATOR
+    _VALIDATOR = validator
+
+
+def _validate_chunk(chunk):
+    """Validate a chunk of payloads in the worker process."""
+    validate = _VALIDATOR.validate
+    return [validate(data) for data in chunk]
+
+
+def _validate_chunk_or_error(chunk):
+    """Validate a chunk of payloads, returning the error raised if any.
+
+    Python 2 pools have no error callbacks, errors are results instead.
+    """
+    try:
+        return _validate_chunk(chunk)
+    except Exception as error:
+        return error
+
+
+def _chunks(iterable, chunksize):
+    """Yield lists of chunksize items of iterable."""
+    iterator = iter(iterable)
+    chunk = list(islice(iterator, chunksize))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, chunksize))
+
+
+def _picklable(validator):
+    """Check validator can be sent to other processes."""
+    try:
+        pickle.dumps(validator, pickle.HIGHEST_PROTOCOL)
+    except (pickle.PicklingError, AttributeError, TypeError):
+        return False
+    return True
+
+
+def _serial(validator, iterable):
+    """Validate each payload in the current process."""
+    for data in iterable:
+        yield validator.validate(data)
+
+
+def validate_many(validator, iterable, workers=None, chunksize=100,
+                  ordered=True):
+    """Yield validation results of payloads validated in a process pool.
+
+    See `JsonValidator.validate_many`.
+    """
+    workers = cpu_count() if workers is None else workers
+    if workers <= 1:
+        return _serial(validator, iterable)
+
+    if not _picklable(validator):
+        warnings.warn(
+            'Validator can not be pickled, validating in current process',
+            RuntimeWarning)
+        return _serial(validator, iterable)
+
+    if ordered:
+        return _ordered(validator, iterable, workers, chunksize)
+    return _unordered(validator, iterable, workers, chunksize)
+
+
+def _ordered(validator, iterable, workers, chunksize):
+    """Yield results in the order of iterable."""
+    pool = Pool(workers, _init_worker, (validator,))
+    pending = deque()
+    try:
+        for chunk in _chunks(iterable, chunksize):
+            pending.append(pool.apply_async(_validate_chunk, (chunk,)))
+            if len(pending) >= workers * PREFETCH:
+                for result in pending.popleft().get():
+                    yield result
+
+        while pending:
+            for result in pending.popleft().get():
+                yield result
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def _unordered(validator, iterable, workers, chunksize):
+    """Yield results as soon as their chunk is validated."""
+    pool = Pool(workers, _init_worker, (validator,))
+    done = Queue()
+    pending = 0
+    try:
+        for chunk in _chunks(iterable, chunksize):
+            pool.apply_async(_validate_chunk_or_error, (chunk,),
+                             callback=done.put)
+            pending += 1
+            while pending >= workers * PREFETCH:
+                pending -= 1
+                for result in _results(done.get()):
+                    yield result
+
+        while pending:
+            pending -= 1
+            for result in _results(done.get()):
+                yield result
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def _results(results):
+    """Return results of a chunk, raising errors of the worker."""
+    if isinstance(results, BaseException):
+        raise results
+    return results
@@ -0,0 +1,218 @@
+"""Patches of validated documents, merge patches and json patches."""
+# -*- coding: utf-8 -*-
+
+from .schema import STRINGS
+
+
+def apply_patch(document, patch):
+    """Return `(document, keys)`, the patched document and its changed keys.
+
+    Lists are json patches (RFC 6902), other patches merge patches
+    (RFC 7386). Keys are the top level keys that may have changed, None
+    when the whole document did. The document is not modified, only its
+    containers along changed paths are copied. Raises ValueError when the
+    patch can not be applied.
+    """
+    if isinstance(patch, list):
+        return apply_json_patch(document, patch)
+    return apply_merge_patch(document, patch)
+
+
+def apply_merge_patch(document, patch):
+    """Apply a merge patch to document, without recursion."""
+    if not isinstance(patch, dict):
+        return patch, None
+    document = type(document)(document) if isinstance(document, dict) else {}
+    stack = [(document, patch)]
+
+    while stack:
+        target, changes = stack.pop()
+        for key, value in changes.items():
+            if value is None:
+                target.pop(key, None)
+            elif isinstance(value, dict):
+                nested = target.get(key)
+                if isinstance(nested, dict):
+                    nested = type(nested)(nested)
+                else:
+                    nested = {}
+                target[key] = nested
+                stack.append((nested, value))
+            else:
+                target[key] = value
+    return document, set(patch)
+
+
+def pointer(path):
+    """Return the keys of a json pointer."""
+    if not isinstance(path, STRINGS) or path[:1] not in ('', '/'):
+        raise ValueError('Invalid pointer {!r}'.format(path))
+    return [key.replace('~1', '/').replace('~0', '~')
+            for key in path.split('/')[1:]]
+
+
+def index(container, key, add=False):
+    """Return the key of container for a pointer key.
+
+    Keys of lists are indexes, `-` is the end of the list when adding.
+    """
+    if isinstance(container, dict):
+        return key
+    if not isinstance(container, list):
+        raise ValueError('Not a container')
+    size = len(container) + 1 if add else len(container)
+    if add and key == '-':
+        return len(container)
+    if not key.isdigit() or (key != '0' and key[0] == '0'):
+        raise ValueError('Invalid index {}'.format(key))
+    if int(key) >= size:
+        raise ValueError('Index {} out of range'.format(key))
+    return int(key)
+
+
+def child(container, key):
+    """Return `(key, value)` of container for a pointer key."""
+    key = index(container, key)
+    try:
+        return key, container[key]
+    except KeyError:
+        raise ValueError('Missing key {}'.format(key))
+
+
+def get(document, keys):
+    """Return the value of document at keys."""
+    value = document
+    for key in keys:
+        value = child(value, key)[1]
+    return value
+
+
+def deep_copy(value):
+    """Return a copy of value and of the dicts and lists inside of it.
+
+    Other values are shared, without recursion.
+    """
+    if not isinstance(value, (dict, list)):
+        return value
+    root = type(value)(value)
+    stack = [root]
+
+    while stack:
+        container = stack.pop()
+        keys = container if isinstance(container, dict) else range(
+            len(container))
+        for key in keys:
+            item = container[key]
+            if isinstance(item, (dict, list)):
+                item = container[key] = type(item)(item)
+                stack.append(item)
+    return root
+
+
+class JsonPatch(object):
+    """Operations of a json patch on a copy of a document.
+
+    Containers are copied once, the first time an operation changes them.
+    """
+
+    def __init__(self, document):
+        """Set the document to patch."""
+        self.document = document
+        self.copies = {}
+        self.keys = set()
+
+    def parent(self, keys):
+        """Return the copy of the container holding the value at keys."""
+        if id(self.document) not in self.copies:
+            self.document = self.copy(self.document)
+        target = self.document
+        for key in keys[:-1]:
+            key, value = child(target, key)
+            if id(value) not in self.copies:
+                value = target[key] = self.copy(value)
+            target = value
+        return target
+
+    def copy(self, container):
+        """Return a copy of container, kept until the patch is applied."""
+        if not isinstance(container, (dict, list)):
+            raise ValueError('Not a container')
+        copy = type(container)(container)
+        self.copies[id(copy)] = copy
+        return copy
+
+    def changed(self, keys):
+        """Add the top level key of a changed path."""
+        if self.keys is not None:
+            if keys:
+                self.keys.add(keys[0])
+            else:
+                self.keys = None
+
+    def add(self, keys, value):
+        """Add or replace the value at keys."""
+        self.changed(keys)
+        if not keys:
+            self.document = value
+            return
+        target = self.parent(keys)
+        key = index(target, keys[-1], add=True)
+        if isinstance(target, list):
+            target.insert(key, value)
+        else:
+            target[key] = value
+
+    def remove(self, keys):
+        """Remove the value at keys, returning it."""
+        self.changed(keys)
+        if not keys:
+            raise ValueError('Can not remove the document')
+        value = get(self.document, keys)
+        target = self.parent(keys)
+        key = index(target, keys[-1])
+        del target[key]
+        return value
+
+    def replace(self, keys, value):
+        """Replace the existing value at keys."""
+        get(self.document, keys)
+        if keys:
+            self.remove(keys)
+        self.add(keys, value)
+
+    def apply(self, operation):
+        """Apply an operation of the patch."""
+        if not isinstance(operation, dict):
+            raise ValueError('Invalid operation')
+        op = operation.get('op')
+        keys = pointer(operation.get('path'))
+
+        if op in ('add', 'replace', 'test') and 'value' not in operation:
+            raise ValueError('Missing value')
+        if op == 'add':
+            self.add(keys, operation['value'])
+        elif op == 'remove':
+            self.remove(keys)
+        elif op == 'replace':
+            self.replace(keys, operation['value'])
+        elif op in ('move', 'copy'):
+            source = pointer(operation.get('from'))
+            if op == 'move':
+                if keys[:len(source)] == source and keys != source:
+                    raise ValueError('Can not move a value into itself')
+                self.add(keys, self.remove(source))
+            else:
+                self.add(keys, deep_copy(get(self.document, source)))
+        elif op == 'test':
+            if get(self.document, keys) != operation['value']:
+                raise ValueError('Test failed')
+        else:
+            raise ValueError('Invalid op {!r}'.format(op))
+
+
+def apply_json_patch(document, patch):
+    """Apply the operations of a json patch to document, in order."""
+    patching = JsonPatch(document)
+    for operation in patch:
+        patching.apply(operation)
+    return patching.document, patching.keys
@@ -0,0 +1,151 @@
+"""Registry of compiled constrains shared by validators."""
+# -*- coding: utf-8 -*-
+
+import gc
+import pickle
+import sys
+from threading import Lock
+
+from .codegen import build, dump_function, load_function
+from .schema import compile_constrain
+
+
+def constrain_key(constrain):
+    """Return `(key, portable)` of a constrain, without recursion.
+
+    Keys of structurally equal constrains are equal: dicts keep the order
+    of their keys and values their type, so `1` and `True` differ. Values
+    that can't be hashed are keyed by identity, the key is not portable to
+    other processes then.
+    """
+    tokens = []
+    portable = True
+    stack = [constrain]
+
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            tokens.append((dict, len(value)))
+            for key, item in reversed(list(value.items())):
+                stack.append(item)
+                stack.append(key)
+        elif isinstance(value, (list, tuple)):
+            tokens.append((type(value), len(value)))
+            stack.extend(reversed(value))
+        elif isinstance(value, (set, frozenset)):
+            tokens.append((type(value), frozenset(value)))
+        else:
+            try:
+                hash(value)
+            except TypeError:
+                tokens.append((id, id(value)))
+                portable = False
+            else:
+                tokens.append((type(value), value))
+    return tuple(tokens), portable
+
+
+def freeze():
+    """Keep the objects created so far out of garbage collections.
+
+    Call it in the parent process right before forking workers, so
+    collections in the workers don't write to the memory pages of shared
+    schemas. Needs python 3.7+, does nothing on older ones.
+    """
+    if hasattr(gc, 'freeze'):
+        gc.freeze()
+
+
+class Registry(object):
+    """Compiled constrains, shared by validators of equal constrains.
+
+    Generated functions of the codegen engine are shared too. Compiled
+    constrains and generated functions can be dumped to a file and loaded
+    in other processes, which then don't compile them again. Functions are
+    only loaded by the same python version that dumped them.
+    """
+
+    def __init__(self):
+        """Set an empty registry."""
+        self._schemas = {}
+        self._functions = {}
+        self._lock = Lock()
+
+    def __len__(self):
+        """Return the number of compiled constrains."""
+        return len(self._schemas)
+
+    def compile(self, constrain):
+        """Return the compiled schema of constrain, compiling it once."""
+        key, portable = constrain_key(constrain)
+        entry = self._schemas.get(key)
+        if entry is None:
+            entry = (compile_constrain(constrain), constrain, portable)
+            with self._lock:
+                entry = self._schemas.setdefault(key, entry)
+        return entry[0]
+
+    def build(self, schema, lazy=False, check_only=False):
+        """Return the generated function of a schema of this registry."""
+        key = (id(schema), lazy, check_only)
+        function = self._functions.get(key)
+        if function is None:
+            function = build(schema, lazy, check_only)
+            with self._lock:
+                function = self._functions.setdefault(key, function)
+        return function
+
+    def clear(self):
+        """Drop all compiled constrains and functions."""
+        with self._lock:
+            self._schemas.clear()
+            self._functions.clear()
+
+    def dump(self, fileobj):
+        """Write compiled constrains to a binary file, return how many.
+
+        Constrains that can't be pickled, like ones with lambda defaults,
+        are left out.
+        """
+        with self._lock:
+            entries = list(self._schemas.items())
+            functions = list(self._functions.items())
+
+        dumps = []
+        for key, (schema, _, portable) in entries:
+            if not portable:
+                continue
+            generated = [(lazy, check_only, dump_function(function))
+                         for (_id, lazy, check_only), function in functions
+                         if _id == id(schema)]
+            try:
+                dumps.append(pickle.dumps((key, schema, generated),
+                                          pickle.HIGHEST_PROTOCOL))
+            except (pickle.PicklingError, TypeError, AttributeError):
+                continue
+        pickle.dump((sys.version, dumps), fileobj, pickle.HIGHEST_PROTOCOL)
+        return len(dumps)
+
+    def load(self, fileobj):
+        """Add compiled constrains of a file written by `dump`.
+
+        Files are unpickled, only load trusted ones. Returns how many
+        constrains were loaded.
+        """
+        version, dumps = pickle.load(fileobj)
+        for dump in dumps:
+            key, schema, generated = pickle.loads(dump)
+            with self._lock:
+                entry = self._schemas.setdefault(key, (schema, None, True))
+            if entry[0] is not schema or version != sys.version:
+                continue
+            for lazy, check_only, function in generated:
+                with self._lock:
+                    self._functions.setdefault(
+                        (id(schema), lazy, check_only),
+                        load_function(*function))
+        return len(dumps)
+
+
+# Registry used when validators are given `registry=True`.
+REGISTRY = Registry()
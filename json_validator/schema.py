@@ -0,0 +1,481 @@
+"""Constrain compilation module."""
+# -*- coding: utf-8 -*-
+
+from abc import ABCMeta, abstractmethod
+from collections import OrderedDict
+from datetime import datetime
+from re import compile as re_compile
+from threading import Lock
+
+try:
+    UNICODE = unicode
+except NameError:
+    unicode = str
+
+NUMBERS = (int, float)
+
+# Types of strings, on python 2 and 3.
+STRINGS = (str, unicode)
+
+# Returned when lazy validation must stop.
+STOP = object()
+
+# Codes of errors whose message is formatted with their value and limit.
+FORMATTED = ('gt', 'lt')
+
+try:
+    FROMISOFORMAT = datetime.fromisoformat
+except AttributeError:
+    FROMISOFORMAT = None
+
+# Usual layout of common dformats, parsed without strptime.
+DFORMATS = {
+    '%Y': r'([0-9]{4})\Z',
+    '%Y-%m-%d': r'([0-9]{4})-([0-9]{2})-([0-9]{2})\Z',
+    '%Y-%m-%dT%H:%M:%S': (r'([0-9]{4})-([0-9]{2})-([0-9]{2})'
+                          r'T([0-9]{2}):([0-9]{2}):([0-9]{2})\Z'),
+    '%Y-%m-%dT%H:%M:%S.%f': (r'([0-9]{4})-([0-9]{2})-([0-9]{2})'
+                             r'T([0-9]{2}):([0-9]{2}):([0-9]{2})'
+                             r'\.((?:[0-9]{3}){1,2})\Z'),
+}
+
+# Compiled patterns shared by all schemas, least recently used are dropped.
+PATTERNS_SIZE = 512
+_PATTERNS = OrderedDict()
+_PATTERNS_LOCK = Lock()
+
+
+def compile_pattern(pattern):
+    """Return the compiled regex of pattern, cached across schemas.
+
+    Already compiled patterns are returned as they are.
+    """
+    if not isinstance(pattern, STRINGS + (bytes,)):
+        return pattern
+
+    with _PATTERNS_LOCK:
+        compiled = _PATTERNS.pop(pattern, None)
+        if compiled is None:
+            compiled = re_compile(pattern)
+            if len(_PATTERNS) >= PATTERNS_SIZE:
+                _PATTERNS.popitem(last=False)
+        _PATTERNS[pattern] = compiled
+    return compiled
+
+
+def batch_valid(node, items):
+    """Check at once that all items of a list are valid numbers of node.
+
+    Only nodes with `batch_types` can be checked. False means some item may
+    be invalid, items must be checked one by one to know which.
+    """
+    if not node.batch_types.issuperset(map(type, items)):
+        return False
+    if float in node.batch_types:
+        total = sum(items)
+        if total != total:
+            return False
+    for check in node.checks:
+        if check.kind == 'gt':
+            if not min(items) > check.limit:
+                return False
+        elif not max(items) < check.limit:
+            return False
+    return True
+
+
+def field(path, key):
+    """Return the dotted field of key inside of path.
+
+    Paths are `(parent_path, key)` links, None for the root.
+    """
+    keys = [key]
+    while path is not None:
+        path, key = path
+        keys.append(key)
+    return '.'.join(key if isinstance(key, STRINGS) else str(key)
+                    for key in reversed(keys))
+
+
+def error_key(path, key):
+    """Return the key of type and dformat errors of a bad value.
+
+    List items use their index, fields ending in a number that number, the
+    dotted field otherwise.
+    """
+    if isinstance(key, int):
+        return key
+    try:
+        return int(key.split('.')[-1])
+    except ValueError:
+        return field(path, key)
+
+
+def format_error(code, template, limit=None, value=None):
+    """Return the message of an error, from the template of its rule."""
+    if code in FORMATTED:
+        return template.format(value=value, limit=limit)
+    return template
+
+
+class Slots(object):
+    """Base class of objects with `__slots__`, picklable by any protocol."""
+
+    __slots__ = ()
+
+    def __getstate__(self):
+        """Return the values of the slots that are set."""
+        state = {}
+        for cls in type(self).__mro__:
+            for name in getattr(cls, '__slots__', ()):
+                if hasattr(self, name):
+                    state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        """Set the values of the slots."""
+        for name, value in state.items():
+            setattr(self, name, value)
+
+
+class DateParser(Slots):
+    """Parse the datetimes of a dformat.
+
+    Values of common dformats in their usual layout, fixed width ascii
+    digits, are parsed without strptime. Other values are parsed with it,
+    so results and errors are the same.
+    """
+
+    __slots__ = ('dformat', 'pattern', 'isoformat')
+
+    def __init__(self, dformat):
+        """Set the dformat and compile its layout, if it is a common one."""
+        self.dformat = dformat
+        self.pattern = None
+        if dformat in DFORMATS:
+            self.pattern = re_compile(DFORMATS[dformat])
+        self.isoformat = FROMISOFORMAT is not None and dformat != '%Y'
+
+    def __call__(self, value):
+        """Return the datetime of value, raise ValueError if invalid."""
+        match = (self.pattern is not None and
+                 isinstance(value, STRINGS) and
+                 self.pattern.match(value))
+        if not match:
+            return datetime.strptime(value, self.dformat)
+        if self.isoformat:
+            return FROMISOFORMAT(value)
+
+        parts = [int(part) for part in match.groups()]
+        if len(parts) == 1:
+            return datetime(parts[0], 1, 1)
+        if len(parts) == 7:
+            parts[6] = int(match.group(7).ljust(6, '0'))
+        return datetime(*parts)
+
+
+class Check(ABCMeta('Abstract', (Slots,), {'__slots__': ()})):
+    """Base class of a compiled extra validation, subclasses set `fails`."""
+
+    __slots__ = ('limit', 'message')
+
+    kind = None
+    default_message = 'Invalid'
+
+    def __init__(self, limit, message=None):
+        """Set the rule limit and the error message."""
+        self.limit = limit
+        self.message = message or self.default_message
+
+    def __call__(self, value):
+        """Return the error message if value fails, None otherwise."""
+        if self.fails(value):
+            return format_error(self.kind, self.message, self.limit, value)
+        return None
+
+    @abstractmethod
+    def fails(self, value):
+        """Check if value fails, without formatting the message."""
+
+
+class GreaterThan(Check):
+    """Check number is greater than limit."""
+
+    __slots__ = ()
+    kind = 'gt'
+    default_message = 'Not greater than {limit}'
+
+    def fails(self, value):
+        """Check value."""
+        return isinstance(value, NUMBERS) and not value > self.limit
+
+
+class LessThan(Check):
+    """Check number is less than limit."""
+
+    __slots__ = ()
+    kind = 'lt'
+    default_message = 'Not less than {limit}'
+
+    def fails(self, value):
+        """Check value."""
+        return isinstance(value, NUMBERS) and not value < self.limit
+
+
+class Format(Check):
+    """Check value matches a regex, compiled once."""
+
+    __slots__ = ('pattern',)
+    kind = 'format'
+    default_message = 'Invalid format'
+
+    def __init__(self, limit, message=None):
+        """Set the rule limit and compile it."""
+        super(Format, self).__init__(limit, message)
+        self.pattern = compile_pattern(limit)
+
+    def fails(self, value):
+        """Check value."""
+        return not self.pattern.match(value)
+
+
+class Inclusion(Check):
+    """Check value is one of the allowed ones.
+
+    Lists, tuples and sets are looked up in a frozenset of their hashable
+    members, then among the unhashable ones, `others`. Other collections,
+    like a `LookupTable`, are looked up as they are.
+    """
+
+    __slots__ = ('members', 'others')
+    kind = 'in'
+    default_message = 'Invalid'
+
+    def __init__(self, limit, message=None):
+        """Set the rule limit and hash its members."""
+        super(Inclusion, self).__init__(limit, message)
+        self.members = limit
+        self.others = ()
+        if isinstance(limit, (list, tuple, set, frozenset)):
+            members = []
+            others = []
+            for member in limit:
+                try:
+                    hash(member)
+                except TypeError:
+                    others.append(member)
+                else:
+                    members.append(member)
+            self.members = frozenset(members)
+            self.others = tuple(others)
+
+    def fails(self, value):
+        """Check value, unhashable values are searched in the limit."""
+        try:
+            if value in self.members:
+                return False
+        except TypeError:
+            return value not in self.limit
+        return not self.others or value not in self.others
+
+
+class Node(Slots):
+    """Compiled rules of a single field.
+
+    Only the rules present in the constrain are kept in `checks`, in the
+    order they were evaluated by the old interpreter: gt, lt, format, in.
+    """
+
+    __slots__ = ('types', 'is_datetime', 'dformat', 'parse_date',
+                 'dformat_error', 'type_error', 'error', 'has_default',
+                 'default', 'call_default', 'checks', 'batch_types',
+                 'properties', 'items')
+
+    def __init__(self, rules):
+        """Resolve the rules of a field, `compile_constrain` sets children."""
+        if 'type' in rules:
+            self.types = (rules['type'],)
+        else:
+            self.types = STRINGS
+        self.is_datetime = rules.get('type', str) == datetime
+        self.dformat = rules.get('dformat') or None
+        self.parse_date = None
+        if self.is_datetime and self.dformat is not None:
+            self.parse_date = DateParser(self.dformat)
+        self.dformat_error = rules.get('dformat_error', 'Invalid format')
+        self.type_error = rules.get('type_error', 'Bad data type')
+        self.error = rules.get('error', 'Missing field')
+
+        self.has_default = 'default' in rules
+        self.default = rules.get('default')
+        self.call_default = callable(self.default)
+
+        checks = []
+        if rules.get('gt') is not None:
+            checks.append(GreaterThan(rules['gt'], rules.get('gt_error')))
+        if rules.get('lt') is not None:
+            checks.append(LessThan(rules['lt'], rules.get('lt_error')))
+        if rules.get('format', False):
+            checks.append(Format(rules['format'], rules.get('format_error')))
+        if rules.get('in', False):
+            checks.append(Inclusion(rules['in'], rules.get('in_error')))
+        self.checks = tuple(checks)
+
+        # Exact types of numbers that lists can check at once, see
+        # `batch_valid`. Other types, like bool, are checked one by one.
+        self.batch_types = None
+        if rules.get('type') in NUMBERS and all(
+                check.kind in ('gt', 'lt') for check in checks):
+            self.batch_types = frozenset((rules['type'],))
+
+        self.properties = None
+        self.items = None
+
+    def get_default(self):
+        """Return the default value of the field."""
+        if self.call_default:
+            return self.default()
+        return self.default
+
+
+class Frame(object):
+    """A dict or list being validated.
+
+    Results are added to `res`, `errors` is only created when an error is
+    found. Both are added to the parent frame when finished, if not empty.
+    """
+
+    __slots__ = ('parent', 'key', 'path', 'node', 'data', 'res', 'errors',
+                 'entries', 'is_list')
+
+    def __init__(self, parent, key, node, data, res, entries, is_list):
+        """Set the container of data, its node is the items one for lists."""
+        self.parent = parent
+        self.key = key
+        self.path = None if parent is None else (parent.path, key)
+        self.node = node
+        self.data = data
+        self.res = res
+        self.errors = None
+        self.entries = entries
+        self.is_list = is_list
+
+    def add_error(self, key, message, check=False):
+        """Add the error of a bad value of key.
+
+        Errors of checks are keyed by their dotted field, others as
+        `error_key` does.
+        """
+        if self.is_list:
+            if self.errors is None:
+                self.errors = []
+            self.errors.append(message)
+        else:
+            if self.errors is None:
+                self.errors = {}
+            if check:
+                self.errors[field(self.path, key)] = message
+            else:
+                self.errors[error_key(self.path, key)] = message
+
+    def add_missing(self, key, message):
+        """Add the error of a missing key."""
+        if self.errors is None:
+            self.errors = {}
+        self.errors[field(self.path, key)] = message
+
+    def finish(self):
+        """Add results and errors to the parent frame."""
+        parent = self.parent
+        if self.res:
+            if parent.is_list:
+                parent.res.append(self.res)
+            else:
+                parent.res[self.key] = self.res
+        if self.errors:
+            if parent.is_list:
+                if parent.errors is None:
+                    parent.errors = []
+                parent.errors.append(self.errors)
+            else:
+                if parent.errors is None:
+                    parent.errors = {}
+                parent.errors[self.key] = self.errors
+
+
+class Changes(dict):
+    """Values changed inside a container, by key or list index.
+
+    Changes of a child container are nested as another `Changes`.
+    """
+
+
+class ChangesFrame(Frame):
+    """A frame whose `res` holds only the changed values of data."""
+
+    __slots__ = ()
+
+    def finish(self):
+        """Add changes and errors to the parent frame."""
+        if self.res:
+            self.parent.res[self.key] = self.res
+        self.res = None
+        super(ChangesFrame, self).finish()
+
+
+def apply_changes(data, changes, copy=True):
+    """Set changes into data, without recursion.
+
+    With `copy` the containers holding a change are copied, data is not
+    modified and unchanged containers are shared with it.
+    """
+    if not changes:
+        return data
+    if copy:
+        data = type(data)(data)
+    stack = [(data, changes)]
+
+    while stack:
+        target, changes = stack.pop()
+        for key, value in changes.items():
+            if isinstance(value, Changes):
+                child = target[key]
+                if copy:
+                    child = target[key] = type(child)(child)
+                stack.append((child, value))
+            else:
+                target[key] = value
+    return data
+
+
+def compile_constrain(constrain):
+    """Compile a constrain dict into a tree of nodes, without recursion.
+
+    The returned root node holds the constrain as its `properties`.
+    """
+    root = Node({'type': dict})
+    stack = [(root, {'properties': constrain})]
+
+    while stack:
+        node, rules = stack.pop()
+
+        if rules.get('properties') is not None:
+            properties = []
+            for key, rule in rules['properties'].items():
+                child = Node(rule)
+                properties.append((key, child))
+                stack.append((child, rule))
+            node.properties = tuple(properties)
+
+        if 'items' in rules:
+            node.items = Node(rules['items'])
+            stack.append((node.items, rules['items']))
+        else:
+            node.items = STRING_NODE
+
+    return root
+
+
+# Rules of list items without `items`, a plain string.
+STRING_NODE = Node({})
+STRING_NODE.items = STRING_NODE
@@ -0,0 +1,193 @@
+"""Profiling of validations by rule kind and field."""
+# -*- coding: utf-8 -*-
+
+from threading import Lock
+from timeit import default_timer
+
+from .schema import Frame
+from .walker import Walker
+
+RULES = ('type', 'gt', 'lt', 'format', 'in', 'dformat', 'default')
+
+
+class Stats(object):
+    """Counts and cumulative seconds of validations.
+
+    Rules are counted by kind, fields by their dotted name, `*` for list
+    items. Seconds of a field are the ones of its rules, not the ones of
+    its children. Errors are counted by field.
+    """
+
+    def __init__(self):
+        """Set empty stats."""
+        self.validations = 0
+        self.seconds = 0.0
+        self.rules = dict((kind, [0, 0.0]) for kind in RULES)
+        self.fields = {}
+        self.errors = {}
+        self._lock = Lock()
+
+    def __getstate__(self):
+        """Return picklable state, the lock is not."""
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        """Restore state with a new lock."""
+        self.__dict__.update(state)
+        self._lock = Lock()
+
+    def add(self, kind, name, seconds):
+        """Add the seconds of a rule of field."""
+        rule = self.rules[kind]
+        rule[0] += 1
+        rule[1] += seconds
+        self.add_field(name, seconds, 0)
+
+    def add_field(self, name, seconds, count=1):
+        """Add a value of field, with the seconds of its rules."""
+        field = self.fields.get(name)
+        if field is None:
+            field = self.fields[name] = [0, 0.0]
+        field[0] += count
+        field[1] += seconds
+
+    def add_error(self, name):
+        """Add an error of field."""
+        self.errors[name] = self.errors.get(name, 0) + 1
+
+    def merge(self, other):
+        """Add the stats of other ones."""
+        with self._lock:
+            self.validations += other.validations
+            self.seconds += other.seconds
+            for stats, others in ((self.rules, other.rules),
+                                  (self.fields, other.fields)):
+                for key, (count, seconds) in others.items():
+                    item = stats.get(key)
+                    if item is None:
+                        item = stats[key] = [0, 0.0]
+                    item[0] += count
+                    item[1] += seconds
+            for name, count in other.errors.items():
+                self.errors[name] = self.errors.get(name, 0) + count
+
+    def snapshot(self):
+        """Return the stats as a dict of plain values."""
+        with self._lock:
+            return {
+                'validations': self.validations,
+                'seconds': self.seconds,
+                'rules': dict(
+                    (kind, {'count': count, 'seconds': seconds})
+                    for kind, (count, seconds) in self.rules.items()),
+                'fields': dict(
+                    (name, {'count': count, 'seconds': seconds})
+                    for name, (count, seconds) in self.fields.items()),
+                'errors': dict(self.errors),
+            }
+
+
+class NamedFrame(Frame):
+    """A frame with the dotted field name of its values."""
+
+    __slots__ = ('name',)
+
+    def __init__(self, parent, key, node, data, res, entries, is_list,
+                 name):
+        """Set the frame and its name, `*` is the name of list items."""
+        super(NamedFrame, self).__init__(parent, key, node, data, res,
+                                         entries, is_list)
+        self.name = name
+
+
+def child_name(name, key):
+    """Return the dotted name of key inside of name."""
+    return key if not name else '{}.{}'.format(name, key)
+
+
+class StatsWalker(Walker):
+    """Walk data recording stats of rules, fields and errors.
+
+    Lists are walked item by item, also lists of numbers.
+    """
+
+    batch = False
+
+    def __init__(self, lazy, stats):
+        """Set the stats to record."""
+        super(StatsWalker, self).__init__(lazy)
+        self.stats = stats
+        self.clock = default_timer
+        # Dotted name of the value being matched.
+        self.name = ''
+
+    def match(self, frame, node, key, obj):
+        """Validate a value recording its field."""
+        name = frame.name if frame.is_list else child_name(frame.name, key)
+        self.stats.add_field(name, 0.0)
+        self.name = name
+        return super(StatsWalker, self).match(frame, node, key, obj)
+
+    def is_type(self, node, obj):
+        """Check the type of a value recording its type rule."""
+        start = self.clock()
+        valid = isinstance(obj, node.types)
+        self.stats.add('type', self.name, self.clock() - start)
+        return valid
+
+    def parse_date(self, node, obj):
+        """Parse a datetime recording its dformat rule."""
+        start = self.clock()
+        try:
+            return node.parse_date(obj)
+        finally:
+            self.stats.add('dformat', self.name, self.clock() - start)
+
+    def fails(self, check, obj):
+        """Check a value recording its rule."""
+        start = self.clock()
+        failed = check.fails(obj)
+        self.stats.add(check.kind, self.name, self.clock() - start)
+        return failed
+
+    def child(self, frame, key, node, obj, entries, is_list):
+        """Return the named frame of a container to walk."""
+        name = self.name
+        if is_list:
+            return NamedFrame(frame, key, node, obj, [], entries, True,
+                              child_name(name, '*'))
+        return NamedFrame(frame, key, node, obj, {}, entries, False, name)
+
+    def default(self, frame, key, node):
+        """Add the default value of a missing key, recording its rule."""
+        name = child_name(frame.name, key)
+        start = self.clock()
+        frame.res[key] = node.get_default()
+        self.stats.add('default', name, self.clock() - start)
+        self.stats.add_field(name, 0.0)
+
+    def missing(self, frame, key, node):
+        """Add the error of a missing key, recording it."""
+        self.stats.add_error(child_name(frame.name, key))
+        return super(StatsWalker, self).missing(frame, key, node)
+
+    def error(self, frame, key, code, template, limit=None, value=None,
+              check=False):
+        """Add the error of a bad value, recording it."""
+        self.stats.add_error(self.name)
+        return super(StatsWalker, self).error(frame, key, code, template,
+                                              limit, value, check)
+
+
+def interpret(data, schema, lazy, stats):
+    """Validate data like `JsonValidator._interpret`, recording stats."""
+    clock = default_timer
+    started = clock()
+    root = NamedFrame(None, None, schema, data, {},
+                      iter(schema.properties or ()), False, '')
+    StatsWalker(lazy, stats).walk(root)
+    stats.validations += 1
+    stats.seconds += clock() - started
+    return root.res, root.errors or {}
@@ -0,0 +1,281 @@
+"""Validation of json streams."""
+# -*- coding: utf-8 -*-
+
+from codecs import getincrementaldecoder
+from json import JSONDecoder
+from json.decoder import py_scanstring
+from json.scanner import py_make_scanner
+from re import compile as re_compile
+
+# Bytes read from files at once.
+CHUNK_SIZE = 1 << 20
+
+DECODER = JSONDecoder()
+
+# Decoder in python, its errors have the right position on python 2 too.
+PY_DECODER = JSONDecoder()
+PY_DECODER.parse_string = py_scanstring
+PY_DECODER.scan_once = py_make_scanner(PY_DECODER)
+
+WHITESPACE = re_compile(r'[ \t\n\r]*')
+
+try:
+    b''.join([memoryview(b'')])
+except TypeError:
+    def view(chunk):
+        """Return chunk, python 2 joins no memoryviews."""
+        return chunk
+else:
+    view = memoryview
+
+# Text of a token, without delimiters, running to the end of the buffer.
+PARTIAL = re_compile(r'[^ \t\n\r,:\[\]{}"]*\Z')
+
+# Position in decode errors messages, python 2 errors lack `pos`.
+ERROR_POS = re_compile(r'\(char ([0-9]+)')
+
+# Errors of strings running to the end, python 2 gives the second one for
+# strings cut right after their quote.
+UNTERMINATED = ('Unterminated string', 'end is out of bounds')
+
+
+def decode_error(error, text, pos):
+    """Return `(message, position)` of the error decoding text at pos.
+
+    Errors of the C scanner of python 2 lack the position, or have a wrong
+    one, the value is decoded again in python to find it.
+    """
+    if hasattr(error, 'pos'):
+        return str(error), error.pos
+    try:
+        PY_DECODER.raw_decode(text, pos)
+    except ValueError as py_error:
+        error = py_error
+    match = ERROR_POS.search(str(error))
+    return str(error), int(match.group(1)) if match else pos
+
+
+def iter_lines(fileobj, chunk_size=CHUNK_SIZE):
+    """Yield `(line_no, line)` of a file object, reading it by chunks.
+
+    Each line is copied once, out of the chunk it was read in, or out of
+    the views of the chunks it spans.
+    """
+    pending = []
+    line_no = 0
+    chunk = fileobj.read(chunk_size)
+    binary = isinstance(chunk, bytes)
+    newline, empty = (b'\n', b'') if binary else ('\n', '')
+
+    while chunk:
+        start = 0
+        end = chunk.find(newline)
+        while end != -1:
+            line_no += 1
+            if pending:
+                pending.append(chunk[start:end])
+                yield line_no, empty.join(pending)
+                pending = []
+            else:
+                yield line_no, chunk[start:end]
+            start = end + 1
+            end = chunk.find(newline, start)
+
+        if start < len(chunk):
+            pending.append(view(chunk)[start:] if binary else
+                           chunk[start:])
+        chunk = fileobj.read(chunk_size)
+
+    if pending:
+        yield line_no + 1, empty.join(pending)
+
+
+def iter_validate_lines(validator, fileobj, chunk_size=CHUNK_SIZE,
+                        skip_valid=False, errors_only=False,
+                        max_errors=None):
+    """Yield `(line_no, res, errors)` of each line of a json lines file.
+
+    See `JsonValidator.iter_validate_lines`.
+    """
+    invalid = 0
+    for line_no, line in iter_lines(fileobj, chunk_size):
+        if not line.strip():
+            continue
+
+        res, errors = validator.validate(line)
+
+        if errors:
+            invalid += 1
+        elif skip_valid:
+            continue
+
+        yield line_no, None if errors_only else res, errors
+
+        if max_errors is not None and invalid >= max_errors:
+            return
+
+
+class Reader(object):
+    """Text buffer of a file object read by chunks, decoded on demand."""
+
+    def __init__(self, fileobj, chunk_size=CHUNK_SIZE):
+        """Set the file object to read."""
+        self.fileobj = fileobj
+        self.chunk_size = chunk_size
+        self.buffer = u''
+        self.pos = 0
+        self.eof = False
+        self._decoder = None
+
+    def read(self, size=0):
+        """Append at least size characters or a chunk to the buffer.
+
+        Return False if nothing was appended, at end of file.
+        """
+        if self.eof:
+            return False
+
+        if self.pos > self.chunk_size:
+            self.buffer = self.buffer[self.pos:]
+            self.pos = 0
+
+        pieces = [self.buffer]
+        read = 0
+        while read < max(size, self.chunk_size):
+            chunk = self.fileobj.read(self.chunk_size)
+            if not chunk:
+                self.eof = True
+                if self._decoder is not None:
+                    pieces.append(self._decoder.decode(b'', True))
+                break
+            if isinstance(chunk, bytes):
+                if self._decoder is None:
+                    self._decoder = getincrementaldecoder('utf-8-sig')()
+                # Empty while the decoder buffers a partial character.
+                chunk = self._decoder.decode(chunk)
+            pieces.append(chunk)
+            read += len(chunk)
+
+        self.buffer = u''.join(pieces)
+        return read > 0
+
+    def peek(self):
+        """Skip whitespaces and return the next character, '' at the end."""
+        while True:
+            self.pos = WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.read():
+                return u''
+
+    def expect(self, chars):
+        """Consume the next character, raise ValueError if not in chars."""
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError('Expecting one of {!r}'.format(chars))
+        self.pos += 1
+        return char
+
+    def incomplete(self, error):
+        """Check if a decode error may be due to the end of the buffer.
+
+        Only errors in a string or a token running to the end of the
+        buffer may be fixed by reading more, others are raised at once.
+        """
+        message, pos = decode_error(error, self.buffer, self.pos)
+        if message.startswith(UNTERMINATED):
+            return True
+        return PARTIAL.match(self.buffer, pos) is not None
+
+    def decode(self):
+        """Decode and consume the json value at the next position."""
+        self.peek()
+        while True:
+            try:
+                value, end = DECODER.raw_decode(self.buffer, self.pos)
+            except ValueError as error:
+                if not self.incomplete(error) or not self.read(
+                        len(self.buffer) - self.pos):
+                    raise
+                continue
+            # Numbers and literals may continue in the next chunk.
+            if end == len(self.buffer) and self.read():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_array(reader):
+    """Yield `(index, item)` of the json array at the reader position."""
+    reader.expect(u'[')
+    if reader.peek() == u']':
+        reader.pos += 1
+        return
+
+    index = 0
+    while True:
+        yield index, reader.decode()
+        index += 1
+        if reader.expect(u',]') == u']':
+            return
+
+
+def iter_property(reader, key):
+    """Find the `key` array of the json object at the reader position.
+
+    Yield `(index, item)` of the array, nothing if the object lacks it.
+    """
+    reader.expect(u'{')
+    if reader.peek() == u'}':
+        return
+
+    while True:
+        if reader.peek() != u'"':
+            raise ValueError('Expecting property name')
+        name = reader.decode()
+        reader.expect(u':')
+        if name == key and reader.peek() == u'[':
+            for item in iter_array(reader):
+                yield item
+            return
+        reader.decode()
+        if reader.expect(u',}') == u'}':
+            return
+
+
+def iter_validate_array(validator, fileobj, key=None,
+                        chunk_size=CHUNK_SIZE):
+    """Yield validation results of the items of a json array file.
+
+    See `JsonValidator.iter_validate_array`.
+    """
+    reader = Reader(fileobj, chunk_size)
+
+    if key is None:
+        if reader.peek() != u'[':
+            yield (None,) + validator._payload_error('2')
+            return
+        items = iter_array(reader)
+
+        def validate(_, item):
+            """Validate item with the constrain."""
+            return validator.validate(item)
+    else:
+        node = dict(validator.schema.properties).get(key)
+        if node is None:
+            raise AttributeError('{} not in constrain'.format(key))
+        items = iter_property(reader, key)
+
+        def validate(index, item):
+            """Validate item with the `items` rule of key."""
+            return validator._interpret_item(node.items, index, key, item)
+
+    while True:
+        try:
+            index, item = next(items)
+        except StopIteration:
+            return
+        except ValueError:
+            yield (None,) + validator._payload_error('1')
+            return
+        yield (index,) + validate(index, item)
@@ -0,0 +1,202 @@
+"""Walk of data with a compiled schema, shared by every validation mode."""
+# -*- coding: utf-8 -*-
+
+from .schema import (
+    STOP, Changes, ChangesFrame, Frame, batch_valid, field, format_error)
+
+
+class Walker(object):
+    """Validate data with a compiled schema, errors are messages.
+
+    Containers are walked depth first with a stack of frames, a frame is
+    suspended while a child container is walked. The rules are only here,
+    subclasses change how errors, defaults and children are recorded.
+    """
+
+    # Lists of numbers are checked at once, walked only if an item may be
+    # invalid.
+    batch = True
+    # Only parsed datetimes are added to results, lists are not copied.
+    changes = False
+
+    def __init__(self, lazy=False):
+        """Set if the walk stops at the first error."""
+        self.lazy = lazy
+
+    def walk(self, frame):
+        """Validate the data of frame and its children, in order."""
+        match = self.match
+        stack = [frame]
+
+        while stack:
+            frame = stack[-1]
+            child = None
+
+            if frame.is_list:
+                node = frame.node
+                for key, obj in frame.entries:
+                    child = match(frame, node, key, obj)
+                    if child is not None:
+                        break
+            else:
+                data = frame.data
+                for key, node in frame.entries:
+                    if key in data:
+                        child = match(frame, node, key, data[key])
+                        if child is not None:
+                            break
+                    elif node.has_default:
+                        self.default(frame, key, node)
+                    else:
+                        child = self.missing(frame, key, node)
+                        if child is not None:
+                            break
+
+            if child is STOP:
+                while len(stack) > 1:
+                    stack.pop().finish()
+                return
+            if child is not None:
+                stack.append(child)
+            else:
+                stack.pop()
+                if stack:
+                    frame.finish()
+
+    def match(self, frame, node, key, obj):
+        """Validate a value of frame with its node.
+
+        Returns the frame of the value if it is a container to walk, STOP
+        when the walk must end.
+        """
+        if not self.is_type(node, obj):
+            if not node.is_datetime:
+                return self.error(frame, key, 'type', node.type_error,
+                                  node.types, obj)
+            if node.dformat is None:
+                raise AttributeError('Missing `dformat` on datetime rule')
+            try:
+                obj = self.parse_date(node, obj)
+            except ValueError:
+                return self.error(frame, key, 'dformat', node.dformat_error,
+                                  node.dformat, obj)
+            if self.changes:
+                frame.res[key] = obj
+                return None
+
+        else:
+            for check in node.checks:
+                if self.fails(check, obj):
+                    return self.error(frame, key, check.kind, check.message,
+                                      check.limit, obj, True)
+
+            if isinstance(obj, dict):
+                if node.properties:
+                    return self.child(frame, key, node, obj,
+                                      iter(node.properties), False)
+                return None
+
+            if isinstance(obj, list):
+                if not obj:
+                    return None
+                items = node.items
+                if (not self.batch or items.batch_types is None or
+                        not batch_valid(items, obj)):
+                    return self.child(frame, key, items, obj,
+                                      enumerate(obj), True)
+                if self.changes:
+                    return None
+                obj = obj[:]
+            elif self.changes:
+                return None
+
+        if frame.is_list:
+            frame.res.append(obj)
+        else:
+            frame.res[key] = obj
+        return None
+
+    @staticmethod
+    def is_type(node, obj):
+        """Check if a value is of the types of node."""
+        return isinstance(obj, node.types)
+
+    @staticmethod
+    def parse_date(node, obj):
+        """Return the datetime of a value, raise ValueError if invalid."""
+        return node.parse_date(obj)
+
+    @staticmethod
+    def fails(check, obj):
+        """Check if a value fails a check."""
+        return check.fails(obj)
+
+    @staticmethod
+    def child(frame, key, node, obj, entries, is_list):
+        """Return the frame of a container to walk."""
+        return Frame(frame, key, node, obj, [] if is_list else {}, entries,
+                     is_list)
+
+    @staticmethod
+    def default(frame, key, node):
+        """Add the default value of a missing key."""
+        frame.res[key] = node.get_default()
+
+    def missing(self, frame, key, node):
+        """Add the error of a missing key, return STOP to end the walk."""
+        frame.add_missing(key, node.error)
+        return STOP if self.lazy else None
+
+    def error(self, frame, key, code, template, limit=None, value=None,
+              check=False):
+        """Add the error of a bad value, return STOP to end the walk.
+
+        `code` is the failed rule, `check` is true for gt, lt, format and in
+        rules.
+        """
+        frame.add_error(key, format_error(code, template, limit, value),
+                        check)
+        return STOP if self.lazy else None
+
+
+class ChangesWalker(Walker):
+    """Validate data keeping only the changed values in results.
+
+    Parsed datetimes and defaults are the only changes.
+    """
+
+    changes = True
+
+    @staticmethod
+    def child(frame, key, node, obj, entries, is_list):
+        """Return the frame of a container to walk."""
+        return ChangesFrame(frame, key, node, obj, Changes(), entries,
+                            is_list)
+
+
+class FirstErrorWalker(ChangesWalker):
+    """Find the first error of data, as `(field, message)` in `first`.
+
+    Defaults are not kept.
+    """
+
+    def __init__(self):
+        """Set no error found yet."""
+        super(FirstErrorWalker, self).__init__(True)
+        self.first = None
+
+    @staticmethod
+    def default(frame, key, node):
+        """Drop default values."""
+
+    def missing(self, frame, key, node):
+        """Keep the error of a missing key and end the walk."""
+        self.first = (field(frame.path, key), node.error)
+        return STOP
+
+    def error(self, frame, key, code, template, limit=None, value=None,
+              check=False):
+        """Keep the error of a bad value and end the walk."""
+        self.first = (field(frame.path, key),
+                      format_error(code, template, limit, value))
+        return STOP
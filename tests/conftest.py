@@ -1,6 +1,14 @@
+import sys
 
 import pytest
 
+collect_ignore = []
+# Benchmarks use tracemalloc, asyncio tests use syntax of python 3.6+.
+if sys.version_info < (3, 4):
+    collect_ignore.append('test_benchmarks.py')
+if sys.version_info < (3, 6):
+    collect_ignore.append('test_aio.py')
+
 
 @pytest.fixture
 def validator():
@@ -0,0 +1,77 @@
+"""Asyncio validation tests."""
+# -*- coding: utf-8 -*-
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from json_validator import JsonValidator
+
+LINES = b'{"a": 1}\n\n{"a": "x"}\nfoo\r\n{"a": 3}'
+
+
+def run(coroutine):
+    """Run coroutine in a new loop."""
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def test_validate_async():
+    """Test payloads are validated in the loop or in an executor."""
+    validator = JsonValidator({'a': {'type': int}})
+
+    async def validate():
+        with ThreadPoolExecutor(1) as executor:
+            return [
+                await validator.validate_async(b'{"a": 1}'),
+                await validator.validate_async(
+                    '{"a": "x"}', executor, inline_size=1),
+                await validator.validate_async({'a': 2}, executor),
+                await validator.validate_async('{', executor),
+            ]
+
+    assert run(validate()) == [
+        ({'a': 1}, {}),
+        ({}, {'a': 'Bad data type'}),
+        ({'a': 2}, {}),
+        (None, {'payload': 'INVALID PAYLOAD'}),
+    ]
+
+
+def test_aiter_validate_lines():
+    """Test lines of a stream are validated as they arrive."""
+    validator = JsonValidator({'a': {'type': int}})
+
+    async def validate(**kwargs):
+        reader = asyncio.StreamReader(limit=4)
+        for start in range(0, len(LINES), 3):
+            reader.feed_data(LINES[start:start + 3])
+        reader.feed_eof()
+        return [item async for item in validator.aiter_validate_lines(
+            reader, **kwargs)]
+
+    assert run(validate()) == [
+        (1, {'a': 1}, {}),
+        (3, {}, {'a': 'Bad data type'}),
+        (4, None, {'payload': 'INVALID PAYLOAD'}),
+        (5, {'a': 3}, {}),
+    ]
+    assert run(validate(skip_valid=True, errors_only=True, max_errors=1)) == [
+        (3, None, {'a': 'Bad data type'})]
+
+
+def test_aiter_validate_lines_fed():
+    """Test results are yielded before the stream ends."""
+    validator = JsonValidator({'a': {'type': int}})
+
+    async def validate():
+        reader = asyncio.StreamReader()
+        lines = validator.aiter_validate_lines(reader)
+        reader.feed_data(b'{"a": 1}\n{"a"')
+        first = await lines.__anext__()
+        reader.feed_data(b': 2}')
+        reader.feed_eof()
+        return [first] + [item async for item in lines]
+
+    assert run(validate()) == [(1, {'a': 1}, {}), (2, {'a': 2}, {})]
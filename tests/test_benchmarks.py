@@ -0,0 +1,35 @@
+"""Benchmarks suite tests."""
+# -*- coding: utf-8 -*-
+import json
+
+import pytest
+
+from benchmarks.payloads import SCENARIOS, generate
+from benchmarks.run import main
+from json_validator import JsonValidator
+
+
+@pytest.mark.parametrize('name', sorted(SCENARIOS))
+def test_payloads(name):
+    """Test payloads are reproducible and validate as expected."""
+    constrain, payloads, options = generate(name, seed=1)
+    assert generate(name, seed=1)[1] == payloads
+    validator = JsonValidator(constrain, **options)
+    for payload in payloads:
+        _, errors = validator.validate(payload)
+        assert bool(errors) == name.startswith('errors')
+
+
+def test_run(tmpdir):
+    """Test results are written as json and compared."""
+    output = str(tmpdir.join('results.json'))
+    args = ['records', '--engine', 'interpreter', '--min-time', '0',
+            '--min-ops', '1', '--output', output]
+    results = main(args)
+    with open(output) as _file:
+        assert json.load(_file) == json.loads(json.dumps(results))
+    item, = results['results']
+    assert item['scenario'] == 'records' and item['ops'] >= 1
+    assert sorted(item['latency_us']) == ['max', 'p50', 'p90', 'p99']
+    assert item['peak_memory_bytes'] > 0
+    main(args[:-2] + ['--compare', output])
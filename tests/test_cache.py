@@ -0,0 +1,69 @@
+"""Results cache tests."""
+# -*- coding: utf-8 -*-
+import pickle
+from datetime import datetime
+from threading import Lock
+
+from json_validator import JsonValidator
+
+CONSTRAIN = {
+    'a': {'type': int},
+    'b': {'type': list, 'items': {'type': dict, 'properties': {
+        'c': {'type': datetime, 'dformat': '%Y'}}}},
+}
+
+
+def test_cache_hits():
+    """Test identical payloads are validated once."""
+    validator = JsonValidator(CONSTRAIN, cache_size=2)
+    payload = '{"a": 1, "b": [{"c": "2020"}]}'
+    expected = ({'a': 1, 'b': [{'c': datetime(2020, 1, 1)}]}, {})
+    assert validator.validate(payload) == expected
+    res, _ = validator.validate(payload)
+    assert res == expected[0]
+
+    res['b'][0]['c'] = None
+    assert validator.validate(payload.encode() + b' ') == expected
+    assert validator.validate(payload) == expected
+    assert validator.validate(dict(expected[0])) == expected
+    assert validator.validate('{"a": "x"}') == ({}, {
+        'a': 'Bad data type', 'b': 'Missing field'})
+    assert validator.validate(payload, {'a': {'type': int}}) == ({'a': 1}, {})
+    assert validator.cache.stats() == {
+        'hits': 2, 'misses': 3, 'evictions': 1, 'results': 2,
+        'used': validator.cache.used}
+
+
+def test_cache_memory():
+    """Test results are dropped when they take more than cache memory."""
+    validator = JsonValidator(CONSTRAIN, cache_size=10)
+    validator.validate('{"a": 0, "b": []}')
+    memory = validator.cache.used * 4
+    validator = JsonValidator(CONSTRAIN, cache_size=10, cache_memory=memory)
+    for value in range(5):
+        validator.validate('{"a": %d, "b": []}' % value)
+    assert 0 < len(validator.cache) < 5
+    assert validator.cache.used <= memory
+    assert validator.cache.evictions == 5 - len(validator.cache)
+
+    validator.validate('{"a": 1, "b": [%s]}' % ', '.join(['{}'] * 100))
+    assert validator.cache.used <= memory
+
+
+def test_cache_bypass():
+    """Test callable defaults and unpicklable results are not cached."""
+    validator = JsonValidator({'a': {'default': datetime.now}},
+                              cache_size=10)
+    assert validator.cache is None
+    validator = JsonValidator({'a': {'default': Lock()}}, cache_size=10)
+    validator.validate('{}')
+    assert len(validator.cache) == 0
+
+
+def test_cache_pickle():
+    """Test pickled validators get an empty cache of the same size."""
+    validator = JsonValidator(CONSTRAIN, cache_size=10, cache_memory=1000)
+    validator.validate('{"a": 1, "b": []}')
+    validator = pickle.loads(pickle.dumps(validator))
+    assert len(validator.cache) == 0
+    assert (validator.cache.size, validator.cache.memory) == (10, 1000)
@@ -0,0 +1,108 @@
+"""Code generation engine tests."""
+# -*- coding: utf-8 -*-
+import gc
+import linecache
+import re
+from datetime import datetime
+
+import pytest
+
+from json_validator import JsonValidator
+
+CONSTRAIN = {
+    'integer': {'type': int, 'gt': 0, 'lt': 10},
+    'number': {'format': r'^\d+$', 'format_error': 'Not a number'},
+    'code': {'format': re.compile(r'^[A-Z]{2}$')},
+    'fruit': {'in': ['apple', 'orange'], 'default': 'apple'},
+    'birthdate': {'type': datetime, 'dformat': '%Y-%m-%d'},
+    'json': {
+        'type': dict,
+        'properties': {
+            'name': {'error': 'Name is required'},
+        }
+    },
+    'list': {
+        'type': list,
+        'items': {
+            'type': dict,
+            'properties': {
+                'age': {'type': list, 'items': {'type': int, 'gt': 0}},
+            }
+        }
+    },
+}
+
+
+@pytest.mark.parametrize('json', [
+    {
+        'integer': 5, 'number': '42', 'code': 'ES', 'birthdate': '1990-12-24',
+        'json': {'name': 'johan'}, 'list': [{'age': [1, 2]}, {'age': [3]}]
+    },
+    {
+        'integer': 10, 'number': 'foo', 'code': 'es', 'fruit': 'cherry',
+        'birthdate': '1990-13-24', 'json': {},
+        'list': [{'age': [1, 0]}, {}, {'age': 'a'}, 42]
+    },
+    {'integer': 'a', 'json': [], 'list': {}},
+    {'integer': 0, 'number': '', 'json': {'name': ''}, 'list': [{'age': []}]},
+])
+def test_codegen_same_results(json):
+    """Test generated function returns the same as the interpreter."""
+    for lazy in (False, True):
+        expected = JsonValidator(CONSTRAIN, lazy=lazy).validate(json)
+        validator = JsonValidator(CONSTRAIN, lazy=lazy, engine='codegen')
+        assert validator.validate(json) == expected
+
+    interpreter = JsonValidator(CONSTRAIN)
+    validator = JsonValidator(CONSTRAIN, engine='codegen')
+    assert validator.first_error(json) == interpreter.first_error(json)
+    assert validator.is_valid(json) == interpreter.is_valid(json)
+
+
+def test_codegen_source():
+    """Test generated source is exposed."""
+    validator = JsonValidator(CONSTRAIN, engine='codegen')
+    assert validator.source.startswith('def validate(data):')
+    assert JsonValidator(CONSTRAIN).source is None
+
+
+def test_codegen_linecache():
+    """Test sources are in linecache only while their function is alive."""
+    validator = JsonValidator(CONSTRAIN, engine='codegen')
+    filename = validator._run.__code__.co_filename
+    assert linecache.getline(filename, 1).startswith('def validate(data):')
+    del validator
+    gc.collect()
+    assert filename not in linecache.cache
+
+
+def test_codegen_default_lambda():
+    """Test callable defaults are called by generated code."""
+    constrain = {'expiration': {'default': lambda: datetime.now()}}
+    comparative = datetime.now()
+    res, err = JsonValidator(constrain, engine='codegen').validate({})
+    assert res['expiration'] > comparative and not err
+
+
+def test_codegen_missing_dformat():
+    """Test datetime rules need `dformat`."""
+    validator = JsonValidator(
+        {'birthdate': {'type': datetime}}, engine='codegen')
+    with pytest.raises(AttributeError):
+        validator.validate({'birthdate': '1990-12-24'})
+
+
+def test_codegen_deep_constrain():
+    """Test too deep constrains fall back to the interpreter."""
+    constrain = {'type': int}
+    for _ in range(30):
+        constrain = {'type': list, 'items': constrain}
+    validator = JsonValidator({'a': constrain}, engine='codegen')
+    assert validator.source is None
+    assert validator.validate({'a': [[]]}) == ({}, {})
+
+
+def test_unknown_engine():
+    """Test engine must be a known one."""
+    with pytest.raises(AttributeError):
+        JsonValidator({}, engine='foo')
@@ -0,0 +1,95 @@
+"""Columnar validation tests."""
+# -*- coding: utf-8 -*-
+from array import array
+from datetime import datetime
+from json import dumps
+
+import pytest
+
+from json_validator import JsonValidator
+from json_validator.columns import TYPECODES
+
+CONSTRAIN = {
+    'id': {'type': int, 'gt': 0},
+    'value': {'type': float, 'lt': 100.0},
+    'name': {'format': r'^[a-z]+$', 'in': ['a', 'b', 'c']},
+}
+
+
+def test_validate_columns():
+    """Test valid records are returned as columns."""
+    validator = JsonValidator(CONSTRAIN)
+    records = [{'id': 1, 'value': 1.5, 'name': 'a', 'extra': 1},
+               {'id': 2, 'value': 2.5, 'name': 'b'}]
+    assert validator.validate_columns(records) == ({
+        'id': [1, 2], 'value': [1.5, 2.5], 'name': ['a', 'b']}, {})
+    assert validator.validate_columns([]) == ({
+        'id': [], 'value': [], 'name': []}, {})
+
+
+def test_validate_columns_errors():
+    """Test invalid records are left out, their errors keyed by index."""
+    validator = JsonValidator(CONSTRAIN)
+    records = [{'id': 1, 'value': 1.5, 'name': 'a'},
+               {'id': 0, 'value': 2.5, 'name': 'b'},
+               'record',
+               {'id': 3, 'value': 3.5},
+               {'id': 4, 'value': 4.5, 'name': 'c'}]
+    assert validator.validate_columns(dumps(records)) == ({
+        'id': [1, 4], 'value': [1.5, 4.5], 'name': ['a', 'c']}, {
+            1: {'id': 'Not greater than 0'},
+            2: {'payload': 'INVALID DATA TYPE'},
+            3: {'name': 'Missing field'}})
+    assert validator.validate_columns('{"id": 1}') == (
+        None, {'payload': 'INVALID DATA TYPE'})
+    assert validator.validate_columns('[') == (
+        None, {'payload': 'INVALID PAYLOAD'})
+
+
+def test_validate_columns_rows():
+    """Test defaults, datetimes and containers are validated row by row."""
+    validator = JsonValidator({
+        'date': {'type': datetime, 'dformat': '%Y-%m-%d'},
+        'tags': {'type': list, 'items': {'type': int}},
+        'flag': {'type': bool, 'default': False},
+    })
+    records = [{'date': '2020-01-02', 'tags': [1, 2], 'flag': True},
+               {'date': '2020-01-03', 'tags': []}]
+    assert validator.validate_columns(records) == ({
+        'date': [datetime(2020, 1, 2), datetime(2020, 1, 3)],
+        'tags': [[1, 2], None],
+        'flag': [True, False]}, {})
+
+
+def test_validate_columns_validated_values():
+    """Test columns only hold values of validated results."""
+    validator = JsonValidator({'a': {'type': dict, 'properties': {
+        'b': {'type': list}}}})
+    record = {'a': {'b': [], 'junk': 'secret'}}
+    assert validator.validate(record) == ({}, {})
+    assert validator.validate_columns([record]) == ({'a': [None]}, {})
+
+
+def test_validate_columns_array():
+    """Test number columns are packed into arrays."""
+    validator = JsonValidator(CONSTRAIN)
+    columns, errors = validator.validate_columns(
+        [{'id': 1, 'value': 1.5, 'name': 'a'}], buffers='array')
+    assert columns == {
+        'id': array(TYPECODES[int], [1]), 'value': array('d', [1.5]),
+        'name': ['a']}
+    assert errors == {}
+
+    with pytest.raises(AttributeError):
+        validator.validate_columns([], buffers='frame')
+
+
+def test_validate_columns_numpy():
+    """Test number columns are packed into numpy arrays."""
+    numpy = pytest.importorskip('numpy')
+    validator = JsonValidator(CONSTRAIN)
+    columns, _ = validator.validate_columns(
+        [{'id': 1, 'value': 1.5, 'name': 'a'}], buffers='numpy')
+    assert isinstance(columns['id'], numpy.ndarray)
+    assert columns['id'].dtype == numpy.int64
+    assert columns['name'] == ['a']
@@ -0,0 +1,90 @@
+"""Schema guided decoding tests."""
+# -*- coding: utf-8 -*-
+import pickle
+from collections import OrderedDict
+from json import dumps
+
+import pytest
+
+from json_validator import ENGINES, JsonValidator
+from json_validator.decoding import SchemaDecoder
+
+# Ordered, lazy decoding depends on the order of properties.
+CONSTRAIN = OrderedDict([
+    ('id', {'type': int, 'gt': 0}),
+    ('name', {'format': r'^[a-z]+$'}),
+    ('note', {'default': ''}),
+    ('rows', {'type': list, 'items': {
+        'type': dict, 'properties': OrderedDict([
+            ('a', {'type': int}),
+            ('b', {'in': ['x', 'y'], 'default': 'x'})])}}),
+    ('blob', {'type': dict}),
+])
+
+PAYLOADS = [
+    {'id': 1, 'name': 'ab', 'rows': [{'a': 1, 'c': [1]}], 'blob': {'k': 1}},
+    {'extra': {'k': [1, 2]}, 'rows': [{'a': 1}, {'a': 'x'}, {'b': 'z'}],
+     'id': 0, 'name': 'AB'},
+    {'name': 'ab', 'id': 2, 'rows': [{'b': 'y'}], 'blob': []},
+    {'id': 'x', 'rows': {}},
+]
+
+
+def test_schema_decoder():
+    """Test unknown keys are dropped and invalid json raises ValueError."""
+    decoder = JsonValidator(CONSTRAIN, decode='schema')._decoder
+    assert isinstance(decoder, SchemaDecoder)
+    assert decoder.decode(
+        u' {"id": 1, "x": {"a": [1, "}"]}, "rows": [{"a": 1, "z": 2}, 3],'
+        u' "n\\u0061me": "a", "blob": {"k": 1}} ') == {
+            'id': 1, 'rows': [{'a': 1}, 3], 'name': 'a', 'blob': {'k': 1}}
+    assert decoder.decode(u'[1, {"x": 1}]') == [1, {'x': 1}]
+    for text in (u'{"id": 1,}', u'{"id" 1}', u'{"rows": [1,]}', u'{} 1',
+                 u'{"id": 1', u'{"x": [}'):
+        with pytest.raises(ValueError):
+            decoder.decode(text)
+
+
+def test_schema_decoder_lazy():
+    """Test lazy decoding stops once the first error is known."""
+    decoder = JsonValidator(CONSTRAIN, decode='schema')._decoder
+    text = u'{"id": 0, "name": "a", "rows": [1, 2, 3]} garbage'
+    assert decoder.decode(text, lazy=True) == {'id': 0}
+    text = u'{"name": "A", "id": 1, "note": "", "rows": [1, 2]} garbage'
+    assert decoder.decode(text, lazy=True) == {
+        'name': 'A', 'id': 1, 'note': '', 'rows': [1]}
+    text = u'{"id": 1, "name": "a", "note": "", "rows": [{"b": "x"}, {'
+    assert decoder.decode(text, lazy=True) == {
+        'id': 1, 'name': 'a', 'note': '', 'rows': [{'b': 'x'}]}
+    with pytest.raises(ValueError):
+        decoder.decode(u'{"name": "A", "rows": [1, 2, 3]} garbage', True)
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+@pytest.mark.parametrize('lazy', (False, True))
+@pytest.mark.parametrize('payload', PAYLOADS)
+def test_decode_schema(engine, lazy, payload):
+    """Test validations with schema decoding are the ones of json loads."""
+    validator = JsonValidator(CONSTRAIN, engine=engine, lazy=lazy)
+    guided = JsonValidator(CONSTRAIN, engine=engine, lazy=lazy,
+                           decode='schema')
+    for data in (dumps(payload), dumps(payload).encode('utf-16'),
+                 memoryview(dumps(payload).encode()), payload):
+        assert guided.validate(data) == validator.validate(data)
+        assert guided.first_error(data) == validator.first_error(data)
+    assert guided.validate('{"id": 1') == (
+        None, {'payload': 'INVALID PAYLOAD'})
+    assert guided.validate(1) == (None, {'payload': 'INVALID DATA TYPE'})
+
+
+def test_decode_schema_options(validator):
+    """Test invalid options and pickling of schema decoding validators."""
+    guided = validator(CONSTRAIN, lazy=True, decode='schema')
+    copy = pickle.loads(pickle.dumps(guided))
+    assert copy.validate(dumps(PAYLOADS[1])) == guided.validate(
+        dumps(PAYLOADS[1]))
+    for options in ({'decode': 'yaml'},
+                    {'decode': 'schema', 'result': 'input'},
+                    {'decode': 'schema', 'loads': lambda data: data}):
+        with pytest.raises(AttributeError):
+            validator(CONSTRAIN, **options)
@@ -0,0 +1,62 @@
+"""Structured errors and max errors tests."""
+# -*- coding: utf-8 -*-
+import pickle
+from collections import OrderedDict
+
+import pytest
+
+from json_validator import ENGINES, JsonValidator, ValidationError
+
+# Ordered, max errors depends on the order of properties.
+CONSTRAIN = OrderedDict([
+    ('id', {'type': int, 'gt': 0, 'gt_error': '{value} not over {limit}'}),
+    ('values', {'type': list, 'items': {'type': int, 'lt': 10}}),
+    ('name', {'format': r'^[a-z]+$'}),
+    ('address', {'type': dict, 'properties': {'city': {}}}),
+])
+
+DATA = {'id': 0, 'values': [1, 20, 'x', 30], 'name': 'A', 'address': {}}
+
+
+def test_errors_object():
+    """Test errors are objects rendered as the default messages."""
+    validator = JsonValidator(CONSTRAIN, errors='object')
+    res, errors = validator.validate(DATA)
+    assert res == {'values': [1]}
+    assert errors['id'].to_dict() == {
+        'code': 'gt', 'field': 'id', 'limit': 0, 'value': 0,
+        'message': '0 not over 0'}
+    assert [error.code for error in errors['values']] == ['lt', 'type', 'lt']
+    assert errors['values'][2].field == 'values.3'
+    assert errors['values'][2].value == 30
+    assert str(errors['name']) == 'Invalid format'
+    missing = errors['address']['address.city']
+    assert (missing.code, missing.field, missing.value) == (
+        'missing', 'address.city', None)
+    assert missing == ValidationError('missing', (None, 'address'), 'city',
+                                      'Missing field')
+    assert missing != errors['name']
+    assert pickle.loads(pickle.dumps(errors)) == errors
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_max_errors(engine):
+    """Test validation stops after max errors."""
+    validator = JsonValidator(CONSTRAIN, engine=engine, max_errors=3)
+    assert validator.validate(DATA) == ({'values': [1]}, {
+        'id': '0 not over 0', 'values': ['Not less than 10',
+                                         'Bad data type']})
+    validator = JsonValidator(CONSTRAIN, engine=engine, max_errors=1,
+                              errors='object')
+    assert validator.validate(DATA)[1]['id'].code == 'gt'
+    assert JsonValidator(CONSTRAIN, max_errors=100).validate(DATA) == \
+        JsonValidator(CONSTRAIN).validate(DATA)
+
+
+def test_errors_options():
+    """Test invalid options of errors."""
+    for options in ({'errors': 'dict'}, {'max_errors': 0},
+                    {'errors': 'object', 'result': 'input'},
+                    {'max_errors': 1, 'profile': True}):
+        with pytest.raises(AttributeError):
+            JsonValidator(CONSTRAIN, **options)
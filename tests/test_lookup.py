@@ -0,0 +1,74 @@
+"""Lookup tables and inclusion rules tests."""
+# -*- coding: utf-8 -*-
+import pickle
+
+import pytest
+
+from json_validator import ENGINES, JsonValidator, LookupTable
+
+CODES = ['C{:05d}'.format(code) for code in range(0, 1000, 2)]
+
+
+@pytest.fixture
+def table(tmpdir):
+    """Return a lookup table of codes."""
+    path = str(tmpdir.join('codes.txt'))
+    LookupTable.write(path, reversed(CODES))
+    return LookupTable.load(path)
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_inclusion(engine):
+    """Test inclusion of hashable and unhashable values and members."""
+    validator = JsonValidator({
+        'code': {'type': (str, int), 'in': ['a', 'b', 1]},
+        'mixed': {'type': (set, str), 'in': [{1, 2}, 'a']},
+        'values': {'type': list, 'items': {'type': object, 'in': ('a', 2)}},
+    }, engine=engine)
+    assert validator.validate({'code': 1, 'mixed': {1, 2},
+                               'values': ['a', 2]}) == (
+        {'code': 1, 'mixed': {1, 2}, 'values': ['a', 2]}, {})
+    assert validator.validate({'code': 'c', 'mixed': {1},
+                               'values': [{}, [2], 'b']}) == ({}, {
+                                   'code': 'Invalid', 'mixed': 'Invalid',
+                                   'values': ['Invalid'] * 3})
+
+
+def test_lookup_table(table, tmpdir):
+    """Test codes of tables, and invalid files and codes."""
+    assert len(table) == len(CODES)
+    assert list(table) == CODES
+    assert 'C00000' in table and b'C00998' in table and 'C00500' in table
+    for value in ('C00001', 'C01000', 'A', 'D', '', 'C00000\nC00002',
+                  2, None):
+        assert value not in table
+    assert LookupTable.load(table.path) is table
+
+    path = str(tmpdir.join('bad.txt'))
+    with open(path, 'wb') as fileobj:
+        fileobj.write(b'b\na\n')
+    with pytest.raises(AttributeError):
+        LookupTable(path)
+    with pytest.raises(AttributeError):
+        LookupTable.write(path, ['a\nb'])
+
+    with open(path, 'wb') as fileobj:
+        fileobj.write(b'a\n\nb')
+    assert list(LookupTable(path)) == ['a', 'b']
+    assert 'b' in LookupTable(path)
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_lookup_table_rules(engine, table, validator):
+    """Test tables as limits of rules of many validators."""
+    first = validator({'code': {'in': table}}, engine=engine)
+    second = validator({'codes': {'type': list, 'items': {'in': table}}},
+                       engine=engine)
+    assert first.validate({'code': 'C00002'}) == ({'code': 'C00002'}, {})
+    assert first.validate({'code': 'C00003'}) == ({}, {'code': 'Invalid'})
+    assert second.validate({'codes': ['C00004', 'x', 'C00006']}) == (
+        {'codes': ['C00004', 'C00006']}, {'codes': ['Invalid']})
+
+    copy = pickle.loads(pickle.dumps(first))
+    assert copy.schema.properties[0][1].checks[0].limit is table
+    assert copy.validate({'code': 'C00003'}) == ({}, {'code': 'Invalid'})
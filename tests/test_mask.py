@@ -0,0 +1,75 @@
+"""Field mask tests."""
+# -*- coding: utf-8 -*-
+import pickle
+from collections import OrderedDict
+from json import dumps
+
+import pytest
+
+from json_validator import ENGINES, JsonValidator, Mask
+
+# Ordered, lazy validation depends on the order of properties.
+CONSTRAIN = {
+    'order': {'type': dict, 'properties': OrderedDict([
+        ('id', {'type': int}),
+        ('total', {'type': float, 'gt': 0.0}),
+        ('items', {'type': list, 'items': {
+            'type': dict, 'properties': OrderedDict([
+                ('sku', {'format': r'^[A-Z]+$'}),
+                ('qty', {'type': int, 'gt': 0}),
+            ])}}),
+    ])},
+    'user': {'type': dict, 'properties': {'name': {}}},
+}
+
+ORDER = {'order': {'total': 3.0, 'items': [{'sku': 'AB', 'qty': 0},
+                                           {'sku': 'x', 'qty': 2}]}}
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_validate_only(engine):
+    """Test only the selected fields and their ancestors are validated."""
+    validator = JsonValidator(CONSTRAIN, engine=engine)
+    assert validator.validate(
+        dumps(ORDER), only=['order.total', 'order.items.sku']) == (
+            {'order': {'total': 3.0, 'items': [{'sku': 'AB'}]}},
+            {'order': {'items': [{'order.items.1.sku': 'Invalid format'}]}})
+    assert validator.validate(ORDER, only=['order.items.*.qty']) == (
+        {'order': {'items': [{'qty': 2}]}},
+        {'order': {'items': [{'order.items.0.qty': 'Not greater than 0'}]}})
+    assert validator.validate(ORDER, only=['user']) == (
+        {}, {'user': 'Missing field'})
+    assert validator.validate(ORDER, only=[('order', 'total'), 'order']) \
+        == validator.validate(ORDER, only=['order'])
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_mask(validator, engine):
+    """Test masks are reusable and belong to their constrain."""
+    validator = validator(CONSTRAIN, engine=engine, lazy=True)
+    mask = validator.mask(['order.items.sku', 'order.total'])
+    assert type(mask).__name__ == Mask.__name__
+    assert validator.validate(ORDER, only=mask) == (
+        {'order': {'total': 3.0, 'items': [{'sku': 'AB'}]}},
+        {'order': {'items': [{'order.items.1.sku': 'Invalid format'}]}})
+    copy, mask_copy = pickle.loads(pickle.dumps((validator, mask)))
+    assert copy.validate(ORDER, only=mask_copy) == validator.validate(
+        ORDER, only=mask)
+
+    with pytest.raises(AttributeError):
+        JsonValidator(CONSTRAIN).validate(ORDER, only=mask)
+    with pytest.raises(AttributeError):
+        validator.mask(['order.items.name'])
+    with pytest.raises(AttributeError):
+        validator.mask('order')
+
+
+def test_mask_result_input():
+    """Test masks with input results and per call constrains."""
+    validator = JsonValidator(CONSTRAIN, result='input')
+    assert validator.validate(ORDER, only=['order.total']) == (ORDER, {})
+    constrain = {'order': {'type': dict, 'properties': {
+        'total': {'type': float}}}, 'note': {}}
+    assert JsonValidator(CONSTRAIN).validate(
+        ORDER, constrain, only=['order']) == (
+            {'order': {'total': 3.0}}, {})
@@ -0,0 +1,52 @@
+"""Validation in a pool of processes tests."""
+# -*- coding: utf-8 -*-
+from datetime import datetime
+from json import dumps
+
+import pytest
+
+CONSTRAIN = {
+    'id': {'type': int, 'gt': 0},
+    'tags': {'type': list, 'items': {'format': r'^[a-z]+$'}},
+}
+
+PAYLOADS = [{'id': ind, 'tags': ['a', 'b' if ind % 3 else 'B']}
+            for ind in range(50)] + [dumps({'id': 1}), '{as: "df"}']
+
+
+@pytest.mark.parametrize('engine', ['interpreter', 'codegen'])
+def test_validate_many(validator, engine):
+    """Test results are the same as validating one by one."""
+    validator = validator(CONSTRAIN, engine=engine)
+    expected = [validator.validate(data) for data in PAYLOADS]
+    assert list(validator.validate_many(
+        PAYLOADS, workers=2, chunksize=7)) == expected
+
+    results = validator.validate_many(
+        PAYLOADS, workers=2, chunksize=7, ordered=False)
+    assert sorted(map(repr, results)) == sorted(map(repr, expected))
+
+
+def test_validate_many_serial(validator):
+    """Test one worker validates in current process."""
+    validator = validator(CONSTRAIN)
+    assert list(validator.validate_many(PAYLOADS, workers=1)) == [
+        validator.validate(data) for data in PAYLOADS]
+
+
+def test_validate_many_not_picklable(validator):
+    """Test lambda defaults fall back to current process."""
+    constrain = {'expiration': {'default': lambda: datetime.now()}}
+    validator = validator(constrain)
+    with pytest.warns(RuntimeWarning):
+        results = list(validator.validate_many([{}, {}], workers=2))
+    assert len(results) == 2 and all(not err for _, err in results)
+
+
+def test_validate_many_worker_error(validator):
+    """Test errors raised in workers are raised back."""
+    validator = validator({'birthdate': {'type': datetime}})
+    for ordered in (True, False):
+        with pytest.raises(AttributeError):
+            list(validator.validate_many(
+                [{'birthdate': '1990'}], workers=2, ordered=ordered))
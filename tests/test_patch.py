@@ -0,0 +1,108 @@
+"""Patch revalidation tests."""
+# -*- coding: utf-8 -*-
+from collections import OrderedDict
+from json import dumps
+
+import pytest
+
+from json_validator import ENGINES, JsonValidator
+from json_validator.patch import apply_json_patch, apply_merge_patch
+
+# Ordered, lazy validation depends on the order of properties.
+CONSTRAIN = OrderedDict([
+    ('id', {'type': int, 'gt': 0}),
+    ('name', {'format': r'^[a-z]+$'}),
+    ('note', {'default': ''}),
+    ('tags', {'type': list, 'items': {'type': int, 'lt': 10}}),
+    ('address', {'type': dict, 'properties': {
+        'city': {}, 'zip': {'type': int}}}),
+])
+
+DOCUMENT = {'id': 1, 'name': 'ab', 'tags': [1, 2],
+            'address': {'city': 'x', 'zip': 1}}
+
+PATCHES = [
+    {'name': 'AB', 'tags': None},
+    {'address': {'zip': None}, 'other': 1},
+    {'id': 2, 'note': 'note'},
+    [{'op': 'add', 'path': '/tags/-', 'value': 20}],
+    [{'op': 'remove', 'path': '/address/city'},
+     {'op': 'replace', 'path': '/id', 'value': 0}],
+    [{'op': 'move', 'from': '/name', 'path': '/note'}],
+    [{'op': 'copy', 'from': '/address', 'path': '/other'},
+     {'op': 'test', 'path': '/id', 'value': 1}],
+    [{'op': 'replace', 'path': '', 'value': {'id': 3}}],
+]
+
+
+def test_apply_merge_patch():
+    """Test merge patches copy changed containers only."""
+    document, keys = apply_merge_patch(DOCUMENT, {
+        'address': {'zip': None, 'street': 'y'}, 'name': None})
+    assert document == {'id': 1, 'tags': [1, 2],
+                        'address': {'city': 'x', 'street': 'y'}}
+    assert keys == {'address', 'name'}
+    assert document['tags'] is DOCUMENT['tags']
+    assert DOCUMENT['address'] == {'city': 'x', 'zip': 1}
+    assert apply_merge_patch(DOCUMENT, [1]) == ([1], None)
+
+
+def test_apply_json_patch_copy():
+    """Test copied values are independent of their source."""
+    document, _ = apply_json_patch({'a': {'x': 1, 'y': [{}]}}, [
+        {'op': 'replace', 'path': '/a/x', 'value': 2},
+        {'op': 'copy', 'from': '/a', 'path': '/b'},
+        {'op': 'replace', 'path': '/b/x', 'value': 3},
+        {'op': 'add', 'path': '/b/y/0/z', 'value': 4}])
+    assert document == {'a': {'x': 2, 'y': [{}]},
+                        'b': {'x': 3, 'y': [{'z': 4}]}}
+
+
+def test_apply_json_patch():
+    """Test json patch operations and invalid ones."""
+    document, keys = apply_json_patch(DOCUMENT, [
+        {'op': 'add', 'path': '/tags/0', 'value': 0},
+        {'op': 'move', 'from': '/address/city', 'path': '/a~1b'},
+        {'op': 'test', 'path': '/tags', 'value': [0, 1, 2]}])
+    assert document == {'id': 1, 'name': 'ab', 'tags': [0, 1, 2],
+                        'address': {'zip': 1}, 'a/b': 'x'}
+    assert keys == {'tags', 'address', 'a/b'}
+    assert DOCUMENT['tags'] == [1, 2]
+
+    for patch in ([{'op': 'remove', 'path': '/missing'}],
+                  [{'op': 'add', 'path': '/tags/3', 'value': 1}],
+                  [{'op': 'add', 'path': 'tags'}],
+                  [{'op': 'test', 'path': '/id', 'value': 2}],
+                  [{'op': 'move', 'from': '/address', 'path': '/address/a'}],
+                  [{'op': 'delete', 'path': '/id'}]):
+        with pytest.raises(ValueError):
+            apply_json_patch(DOCUMENT, patch)
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+@pytest.mark.parametrize('patch', PATCHES)
+def test_validate_patch(engine, patch):
+    """Test patched documents validate as a full validation does."""
+    validator = JsonValidator(CONSTRAIN, engine=engine)
+    previous = validator.validate(DOCUMENT)
+    result = validator.validate_patch(DOCUMENT, patch, previous)
+    assert result == validator.validate_patch(DOCUMENT, patch, previous,
+                                              full=True)
+    assert result[1:] == validator.validate(result[0])
+    assert validator.validate_patch(DOCUMENT, dumps(patch), previous) == \
+        result
+
+
+def test_validate_patch_errors():
+    """Test errors of invalid patches and of previous documents."""
+    validator = JsonValidator(CONSTRAIN, lazy=True)
+    previous = validator.validate({'id': 0})
+    assert validator.validate_patch({'id': 0}, {'id': 1}, previous) == (
+        {'id': 1}, {'id': 1}, {'name': 'Missing field'})
+    assert validator.validate_patch(DOCUMENT, '{', previous) == (
+        DOCUMENT, None, {'payload': 'INVALID PAYLOAD'})
+    assert validator.validate_patch(DOCUMENT, 1, previous) == (
+        DOCUMENT, None, {'payload': 'INVALID PATCH'})
+    assert validator.validate_patch(
+        DOCUMENT, [{'op': 'remove', 'path': '/missing'}], previous) == (
+            DOCUMENT, None, {'payload': 'INVALID PATCH'})
@@ -0,0 +1,91 @@
+"""Compiled constrains registry tests."""
+# -*- coding: utf-8 -*-
+import gc
+import pickle
+from collections import OrderedDict
+from datetime import datetime
+from io import BytesIO
+
+from json_validator import REGISTRY, JsonValidator, Registry, freeze
+from json_validator.registry import constrain_key
+
+
+def constrain():
+    """Return a new constrain dict."""
+    return {
+        'a': {'type': int, 'gt': 1, 'in': [2, 3]},
+        'b': {'type': list, 'items': {'type': dict, 'properties': {
+            'c': {'type': datetime, 'dformat': '%Y-%m-%d'},
+            'd': {'format': r'^\w+$', 'default': 'd'}}}},
+    }
+
+
+def test_constrain_key():
+    """Test keys of structurally equal constrains are equal."""
+    assert constrain_key(constrain()) == constrain_key(constrain())
+    assert constrain_key(OrderedDict([('a', {}), ('b', {})])) != \
+        constrain_key(OrderedDict([('b', {}), ('a', {})]))
+    assert constrain_key({'a': {'gt': 1}}) != constrain_key(
+        {'a': {'gt': True}})
+    assert constrain_key({'a': {'in': [1]}}) != constrain_key(
+        {'a': {'in': (1,)}})
+    assert constrain_key({'a': {'in': [[1]]}})[1]
+    assert not constrain_key({'a': {'default': bytearray()}})[1]
+
+
+def test_registry_shares():
+    """Test validators of equal constrains share schemas and functions."""
+    registry = Registry()
+    first = JsonValidator(constrain(), engine='codegen', registry=registry)
+    second = JsonValidator(constrain(), engine='codegen', registry=registry)
+    lazy = JsonValidator(constrain(), engine='codegen', lazy=True,
+                         registry=registry)
+    assert first.schema is second.schema is lazy.schema
+    assert first._run is second._run
+    assert first._run is not lazy._run
+    assert len(registry) == 1
+
+    other = JsonValidator({'a': {}}, registry=registry)
+    assert other.schema is not first.schema
+    shared = JsonValidator(constrain(), registry=True)
+    assert shared.schema is REGISTRY.compile(constrain())
+    registry.clear()
+    assert len(registry) == 0
+
+
+def test_registry_dump_load():
+    """Test compiled constrains and functions are loaded from a file."""
+    registry = Registry()
+    validator = JsonValidator(constrain(), engine='codegen',
+                              registry=registry)
+    JsonValidator({'a': {'default': lambda: 1}}, registry=registry)
+    fileobj = BytesIO()
+    assert registry.dump(fileobj) == 1
+
+    loaded = Registry()
+    assert loaded.load(BytesIO(fileobj.getvalue())) == 1
+    other = JsonValidator(constrain(), engine='codegen', registry=loaded)
+    assert other.schema is loaded.compile(constrain())
+    assert other._run is loaded.build(other.schema)
+    assert other.source == validator.source
+
+    data = {'a': 2, 'b': [{'c': '2020-01-02'}, {'c': 'x', 'd': '-'}]}
+    assert other.validate(data) == validator.validate(data)
+    assert other.first_error(data) == validator.first_error(data)
+
+
+def test_registry_pickle(validator):
+    """Test pickled validators don't take their registry with them."""
+    registry = Registry()
+    validator = validator(constrain(), engine='codegen', registry=registry)
+    validator = pickle.loads(pickle.dumps(validator))
+    assert validator.registry is None
+    assert validator.validate({'a': 2, 'b': []}) == ({'a': 2}, {})
+
+
+def test_freeze():
+    """Test objects are moved out of garbage collections."""
+    freeze()
+    if hasattr(gc, 'freeze'):
+        assert gc.get_freeze_count() > 0
+        gc.unfreeze()
@@ -0,0 +1,69 @@
+"""Profiling stats tests."""
+# -*- coding: utf-8 -*-
+import pickle
+from datetime import datetime
+
+import pytest
+
+from json_validator import JsonValidator
+
+CONSTRAIN = {
+    'a': {'type': int, 'gt': 1},
+    'b': {'type': list, 'items': {'type': datetime, 'dformat': '%Y'}},
+    'c': {'default': 'c', 'format': r'^\w+$'},
+}
+
+
+def counts(items):
+    """Return the counts of stats items."""
+    return dict((key, item['count']) for key, item in items.items()
+                if item['count'])
+
+
+def test_stats():
+    """Test rules, fields and errors are counted."""
+    validator = JsonValidator(CONSTRAIN, profile=True)
+    assert validator.validate({'a': 1, 'b': ['2020', 'x']}) == (
+        {'b': [datetime(2020, 1, 1)], 'c': 'c'},
+        {'a': 'Not greater than 1', 'b': ['Invalid format']})
+    validator.validate({'a': 2, 'b': [], 'c': 'd'})
+
+    stats = validator.stats()
+    assert stats['validations'] == 2
+    assert stats['seconds'] > 0
+    assert counts(stats['rules']) == {
+        'type': 7, 'gt': 2, 'dformat': 2, 'format': 1, 'default': 1}
+    assert counts(stats['fields']) == {'a': 2, 'b': 2, 'b.*': 2, 'c': 2}
+    assert stats['errors'] == {'a': 1, 'b.*': 1}
+    assert validator.stats(reset=True) == stats
+    assert validator.stats()['validations'] == 0
+
+
+def test_stats_hook():
+    """Test the hook gets the stats of each validation."""
+    calls = []
+    validator = JsonValidator(CONSTRAIN, lazy=True, profile=calls.append)
+    validator.validate({'b': ['2020']})
+    validator.validate({'a': 'x'})
+    assert [call['validations'] for call in calls] == [1, 1]
+    assert [call['errors'] for call in calls] == [{'a': 1}, {'a': 1}]
+    assert validator.stats()['errors'] == {'a': 2}
+
+
+def test_stats_disabled():
+    """Test validators without profile don't profile."""
+    validator = JsonValidator(CONSTRAIN, engine='codegen')
+    assert validator._run is not validator._profile
+    with pytest.raises(AttributeError):
+        validator.stats()
+    with pytest.raises(AttributeError):
+        JsonValidator(CONSTRAIN, profile=True, result='input')
+
+
+def test_stats_pickle(validator):
+    """Test profiled validators can be pickled."""
+    validator = validator(CONSTRAIN, profile=True)
+    validator.validate({'a': 2, 'b': []})
+    validator = pickle.loads(pickle.dumps(validator))
+    validator.validate({'a': 2, 'b': []})
+    assert validator.stats()['validations'] == 2
@@ -0,0 +1,142 @@
+"""Json streams validation tests."""
+# -*- coding: utf-8 -*-
+from io import BytesIO, StringIO
+from json import dumps
+
+import pytest
+
+from json_validator import JsonValidator
+
+LINES = b'{"a": 1}\n\n{"a": "x"}\nfoo\r\n{"a": 3}'
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 8, 1024])
+def test_iter_validate_lines(chunk_size):
+    """Test each line is validated whatever the chunk size is."""
+    validator = JsonValidator({'a': {'type': int}})
+    results = validator.iter_validate_lines(
+        BytesIO(LINES), chunk_size=chunk_size)
+    assert list(results) == [
+        (1, {'a': 1}, {}),
+        (3, {}, {'a': 'Bad data type'}),
+        (4, None, {'payload': 'INVALID PAYLOAD'}),
+        (5, {'a': 3}, {}),
+    ]
+
+
+def test_iter_validate_lines_text():
+    """Test text files are validated too."""
+    validator = JsonValidator({'a': {'type': int}})
+    results = validator.iter_validate_lines(
+        StringIO(u'{"a": 1}\n{"a": 2}\n'), chunk_size=4)
+    assert list(results) == [(1, {'a': 1}, {}), (2, {'a': 2}, {})]
+
+
+def test_iter_validate_lines_options():
+    """Test skipping valid lines, results and stopping on errors."""
+    validator = JsonValidator({'a': {'type': int}})
+    results = validator.iter_validate_lines(
+        BytesIO(LINES), skip_valid=True, errors_only=True)
+    assert list(results) == [
+        (3, None, {'a': 'Bad data type'}),
+        (4, None, {'payload': 'INVALID PAYLOAD'}),
+    ]
+
+    results = validator.iter_validate_lines(BytesIO(LINES), max_errors=1)
+    assert [line_no for line_no, _, _ in results] == [1, 3]
+
+
+ARRAY_CONSTRAIN = {
+    'id': {'type': int},
+    'list': {
+        'type': list,
+        'items': {'type': dict, 'properties': {'x': {'type': int, 'gt': 2}}}
+    },
+}
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 1024])
+def test_iter_validate_array(chunk_size):
+    """Test each item of a top level array is validated."""
+    validator = JsonValidator({'id': {'type': int}})
+    fileobj = BytesIO(b' [{"id": 1}, {"id": "x"}, {"id": 123456789}, {}] ')
+    results = validator.iter_validate_array(fileobj, chunk_size=chunk_size)
+    assert list(results) == [
+        (0, {'id': 1}, {}),
+        (1, {}, {'id': 'Bad data type'}),
+        (2, {'id': 123456789}, {}),
+        (3, {}, {'id': 'Missing field'}),
+    ]
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 1024])
+def test_iter_validate_array_multibyte(chunk_size):
+    """Test chunks ending inside a character don't end the file."""
+    validator = JsonValidator({'id': {}})
+    json = dumps([{'id': u'\u2028\u20ac'}, {'id': 1}], ensure_ascii=False)
+    results = validator.iter_validate_array(
+        BytesIO(json.encode('utf-8')), chunk_size=chunk_size)
+    assert list(results) == [
+        (0, {'id': u'\u2028\u20ac'}, {}),
+        (1, {}, {'id': 'Bad data type'}),
+    ]
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 1024])
+def test_iter_validate_array_key(chunk_size):
+    """Test items of an array property are the ones of validate."""
+    validator = JsonValidator(ARRAY_CONSTRAIN)
+    json = (b'{"id": 1, "other": [{"x": 1}], '
+            b'"list": [{"x": 1}, {"x": 5}, 7, {}], "after": 1}')
+    results = list(validator.iter_validate_array(
+        BytesIO(json), key='list', chunk_size=chunk_size))
+    assert results == [
+        (0, None, {'list.0.x': 'Not greater than 2'}),
+        (1, {'x': 5}, None),
+        (2, None, 'Bad data type'),
+        (3, None, {'list.3.x': 'Missing field'}),
+    ]
+
+    res, err = validator.validate(json.decode())
+    assert res['list'] == [item for _, item, _ in results if item]
+    assert err['list'] == [error for _, _, error in results if error]
+
+
+def test_iter_validate_array_errors():
+    """Test payload errors are yielded."""
+    validator = JsonValidator({'id': {'type': int}})
+    results = validator.iter_validate_array(
+        BytesIO(b'[{"id": 1}, {"id": 2'), chunk_size=4)
+    assert list(results) == [
+        (0, {'id': 1}, {}), (None, None, {'payload': 'INVALID PAYLOAD'})]
+
+    results = validator.iter_validate_array(BytesIO(b'{"id": 1}'))
+    assert list(results) == [(None, None, {'payload': 'INVALID DATA TYPE'})]
+
+    with pytest.raises(AttributeError):
+        list(validator.iter_validate_array(BytesIO(b'{}'), key='foo'))
+
+
+class CountingIO(BytesIO):
+    """Binary file counting the bytes read."""
+
+    read_bytes = 0
+
+    def read(self, size=-1):
+        """Read and count bytes."""
+        data = BytesIO.read(self, size)
+        self.read_bytes += len(data)
+        return data
+
+
+@pytest.mark.parametrize('bad', [b'{"id": 1 "x": 2}', b'{"id": x}',
+                                 b'[1,, 2]', b'{"id": [1}'])
+def test_iter_validate_array_stops_reading(bad):
+    """Test files are not read past malformed items."""
+    validator = JsonValidator({'id': {'type': int}})
+    fileobj = CountingIO(b'[{"id": 1}, ' + bad + b', ' +
+                         b'{"id": 2}, ' * 10000 + b'{}]')
+    results = validator.iter_validate_array(fileobj, chunk_size=64)
+    assert list(results) == [
+        (0, {'id': 1}, {}), (None, None, {'payload': 'INVALID PAYLOAD'})]
+    assert fileobj.read_bytes <= 128
@@ -1,11 +1,14 @@
 """Json schemas validator."""
 # -*- coding: utf-8 -*-
+import pickle
+import re
 from datetime import datetime
 from json import dumps
 
 import pytest
 
-from json_validator import JsonValidator
+from json_validator import ENGINES, JsonValidator
+from json_validator.schema import Check, GreaterThan, Inclusion
 
 
 def test_validator_needs_constrain():
@@ -28,6 +31,36 @@ def test_validator_valid_json():
     assert err and not res
 
 
+def test_validator_binary_json():
+    """Test validator recieves json bytes, bytearray and memoryview."""
+    data = {'foo': 'bar'}
+    raw = dumps(data).encode('utf-8')
+    for payload in (raw, bytearray(raw), memoryview(raw)):
+        res, err = JsonValidator._convert(payload)
+        assert res == data and not err
+
+    buffer = memoryview(b'xx' + raw + b'yy')
+    res, err = JsonValidator._convert(buffer[2:-2])
+    assert res == data and not err
+
+    res, err = JsonValidator._convert(memoryview(b'{"foo": "\xff"}'))
+    assert err == '1' and not res
+
+
+def test_validator_loads():
+    """Test custom loads function is used to decode payloads."""
+    calls = []
+
+    def loads(data):
+        calls.append(data)
+        return {'foo': 'bar'}
+
+    validator = JsonValidator({'foo': {}}, loads=loads)
+    payload = memoryview(b'{}')
+    assert validator.validate(payload) == ({'foo': 'bar'}, {})
+    assert calls == [payload]
+
+
 def test_recieves_invalid_payload():
     """Test invalid payload retrival."""
     res, err = JsonValidator({}).validate('{as: "df"}')
@@ -196,6 +229,20 @@ def test_regex_rule():
     assert res == json and not err
 
 
+def test_compiled_regex_rule():
+    """Test format regexes are compiled once and shared between schemas."""
+    first = JsonValidator({'number': {'format': r'^\d+$'}})
+    second = JsonValidator({'code': {'format': r'^\d+$'}})
+    pattern = dict(first.schema.properties)['number'].checks[0].pattern
+    assert pattern is dict(second.schema.properties)['code'].checks[0].pattern
+
+    constrain = {'number': {'format': re.compile(r'^\d+$')}}
+    res, err = JsonValidator(constrain).validate({'number': 'foo'})
+    assert not res and err == {'number': 'Invalid format'}
+    res, err = JsonValidator(constrain).validate({'number': '42'})
+    assert res == {'number': '42'} and not err
+
+
 def test_default_rule():
     """Test fields ruled by regex."""
     constrain = {
@@ -396,3 +443,272 @@ def test_calls_default_lambda():
     assert res and not err
 
     assert res['expiration'] > comparative
+
+
+def test_compiled_schema():
+    """Test constrain is compiled once with only its present checks."""
+    constrain = {
+        'a': {'type': int, 'gt': 0},
+        'b': {
+            'type': list,
+            'items': {'type': int, 'lt': 10, 'in': [1, 2]}
+        },
+    }
+    validator = JsonValidator(constrain)
+    nodes = dict(validator.schema.properties)
+    assert [check.kind for check in nodes['a'].checks] == ['gt']
+    assert [check.kind for check in nodes['b'].items.checks] == ['lt', 'in']
+    assert nodes['a'].types == (int,)
+
+    res, err = validator.validate({'a': 0, 'b': [1, 11, 3]})
+    assert res == {'b': [1]} and err == {
+        'a': 'Not greater than 0', 'b': ['Not less than 10', 'Invalid']}
+
+
+def test_pickle_schema():
+    """Test compiled constrains are pickled by every protocol."""
+    validator = JsonValidator({
+        'a': {'type': int, 'gt': 0, 'in': [1, [2]]},
+        'b': {'type': datetime, 'dformat': '%Y'},
+        'c': {'format': r'^\w$', 'default': 'x'},
+    })
+    data = {'a': 0, 'b': '2020'}
+    for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+        schema = pickle.loads(pickle.dumps(validator.schema, protocol))
+        assert validator._interpret(data, schema) == validator.validate(data)
+
+
+def test_checks():
+    """Test checks return their formatted message, the base is abstract."""
+    assert GreaterThan(1)(1) == 'Not greater than 1'
+    assert GreaterThan(1, '{value} <= {limit}')(0) == '0 <= 1'
+    assert GreaterThan(1)(2) is None
+    assert Inclusion([[1]], 'Bad')([1]) is None
+    assert Inclusion([[1]], 'Bad')(1) == 'Bad'
+    with pytest.raises(TypeError):
+        Check(1)
+
+
+def test_lazy_nested_valid():
+    """Test lazy validation of valid nested structures has no errors."""
+    constrain = {
+        'a': {'type': dict, 'properties': {'b': {}}},
+        'c': {'type': list, 'items': {'type': int}},
+    }
+    json = {'a': {'b': 'foo'}, 'c': [1, 2]}
+    res, err = JsonValidator(constrain, lazy=True).validate(json)
+    assert res == json and not err
+
+
+def test_clean_data_list_of_dicts():
+    """Test only failing list items are kept in errors."""
+    constrain = {
+        'list': {
+            'type': list,
+            'items': {'type': dict, 'properties': {'a': {'type': int}}}
+        }
+    }
+    json = {'list': [{'a': 1}, {'a': 2}, {'a': 'x'}]}
+    res, err = JsonValidator(constrain).validate(json)
+    assert res == {'list': [{'a': 1}, {'a': 2}]}
+    assert err == {'list': [{'list.2.a': 'Bad data type'}]}
+
+
+def test_error_keys():
+    """Test error keys of nested fields, list items and numeric fields."""
+    constrain = {
+        'a': {
+            'type': dict,
+            'properties': {
+                'b': {'type': int},
+                '5': {'type': int},
+                'c': {
+                    'type': list,
+                    'items': {
+                        'type': dict,
+                        'properties': {'d': {'type': int}, 'e': {}}
+                    }
+                },
+            }
+        },
+    }
+    json = {'a': {'b': 'x', '5': 'x', 'c': [{'d': 'x', 'e': 'y'}, 'x']}}
+    res, err = JsonValidator(constrain).validate(json)
+    assert res == {'a': {'c': [{'e': 'y'}]}}
+    assert err == {'a': {
+        'a.b': 'Bad data type',
+        5: 'Bad data type',
+        'c': [{'a.c.0.d': 'Bad data type'}, 'Bad data type'],
+    }}
+
+    res, err = JsonValidator(constrain).validate({'a': {'c': [{}]}})
+    assert err == {'a': {
+        'a.b': 'Missing field', 'a.5': 'Missing field',
+        'c': [{'a.c.0.d': 'Missing field', 'a.c.0.e': 'Missing field'}],
+    }}
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_check_error_keys(engine):
+    """Test errors of checks of numeric fields are keyed by their field."""
+    constrain = {
+        '2': {'type': int, 'lt': 10},
+        'zip': {'type': dict, 'properties': {
+            '5': {'format': r'^x$'}, '6': {'type': int}}},
+        'o': {'type': dict, 'properties': {'3': {'in': ['a']}}},
+        'l': {'type': list, 'items': {'type': int, 'gt': 1}},
+    }
+    json = {'2': 20, 'zip': {'5': 'y', '6': 'x'}, 'o': {'3': 'b'},
+            'l': [0, 2]}
+    assert JsonValidator(constrain, engine=engine).validate(json) == (
+        {'l': [2]}, {
+            '2': 'Not less than 10',
+            'zip': {'zip.5': 'Invalid format', 6: 'Bad data type'},
+            'o': {'o.3': 'Invalid'},
+            'l': ['Not greater than 1']})
+
+
+def test_special_types():
+    """Test datetimes are parsed by special types."""
+    res, errors = {}, {}
+    rules = {'type': datetime, 'dformat': '%Y', 'dformat_error': 'Bad'}
+    assert JsonValidator.special_types('2020', rules, 'a', 'b.a', res,
+                                       errors)
+    assert JsonValidator.special_types('x', rules, 'c', 'b.c', res, errors)
+    assert not JsonValidator.special_types('x', {}, 'd', 'b.d', res, errors)
+    assert res == {'a': datetime(2020, 1, 1)} and errors == {'b.c': 'Bad'}
+    with pytest.raises(AttributeError):
+        JsonValidator.special_types('x', {'type': datetime}, 'a', 'a', res,
+                                    errors)
+
+
+def test_falsy_values():
+    """Test falsy values and defaults are kept in results."""
+    constrain = {
+        'integer': {'type': int},
+        'boolean': {'type': bool},
+        'string': {},
+        'list': {'type': list, 'items': {'type': int}},
+        'default': {'type': int, 'default': 0},
+        'optional': {'default': None},
+    }
+    json = {'integer': 0, 'boolean': False, 'string': '', 'list': [0, 1]}
+    res, err = JsonValidator(constrain).validate(json)
+    assert not err and res == {
+        'integer': 0, 'boolean': False, 'string': '', 'list': [0, 1],
+        'default': 0, 'optional': None}
+
+
+def test_first_error():
+    """Test first error is found without building results."""
+    constrain = {
+        'a': {'type': int},
+        'b': {
+            'type': list,
+            'items': {'type': dict, 'properties': {'c': {'type': int}}}
+        },
+        'd': {'default': 'd'},
+    }
+    validator = JsonValidator(constrain)
+    assert validator.first_error({'a': 1, 'b': [{'c': 1}]}) is None
+    assert validator.is_valid({'a': 1, 'b': []})
+
+    json = {'a': 1, 'b': [{'c': 1}, {'c': 'x'}, 42]}
+    assert validator.first_error(json) == ('b.1.c', 'Bad data type')
+    assert not validator.is_valid(json)
+    assert validator.first_error({'b': [42]}) == ('a', 'Missing field')
+    assert validator.first_error({'a': 1, 'b': [42]}) == (
+        'b.0', 'Bad data type')
+    assert validator.first_error('{as: "df"}') == (
+        'payload', 'INVALID PAYLOAD')
+
+    validator = JsonValidator(constrain, decode_error='bad json')
+    assert validator.first_error('{') == ('payload', 'bad json')
+    assert not validator.is_valid('{')
+    validator = JsonValidator(constrain, decode_error={'json': 'bad'})
+    assert validator.first_error('{') == ('json', 'bad')
+
+
+def test_result_input():
+    """Test input is returned as result, copying only changed containers."""
+    constrain = {
+        'a': {'type': int},
+        'b': {'type': dict, 'properties': {'c': {'type': int}}},
+        'd': {
+            'type': list,
+            'items': {
+                'type': dict,
+                'properties': {
+                    'e': {'type': datetime, 'dformat': '%Y-%m-%d'},
+                    'f': {'default': 'f'},
+                }
+            }
+        },
+    }
+    validator = JsonValidator(constrain, result='input')
+    json = {'a': 1, 'b': {'c': 2}, 'x': 'unknown'}
+    res, errors = validator.validate(json)
+    assert res is json
+    assert errors == {'d': 'Missing field'}
+
+    json = {'a': 'x', 'b': {'c': 2},
+            'd': [{'e': '2020-01-02', 'f': 'g'}, {'e': 'bad'}]}
+    res, errors = validator.validate(json)
+    assert errors == {'a': 'Bad data type', 'd': [{'d.1.e': 'Invalid format'}]}
+    assert res == {'a': 'x', 'b': {'c': 2}, 'd': [
+        {'e': datetime(2020, 1, 2), 'f': 'g'}, {'e': 'bad', 'f': 'f'}]}
+    assert res is not json and res['b'] is json['b']
+    assert json['d'] == [{'e': '2020-01-02', 'f': 'g'}, {'e': 'bad'}]
+
+    res, errors = validator.validate(dumps({'a': 1, 'b': {}, 'd': [{}]}))
+    assert res == {'a': 1, 'b': {}, 'd': [{'f': 'f'}]}
+    assert errors == {'b': {'b.c': 'Missing field'},
+                      'd': [{'d.0.e': 'Missing field'}]}
+
+    with pytest.raises(AttributeError):
+        JsonValidator(constrain, result='view')
+
+
+def test_number_lists():
+    """Test lists of numbers checked at once give the same results."""
+    constrain = {
+        'a': {'type': list, 'items': {'type': int, 'gt': 0, 'lt': 1000}},
+        'b': {'type': list, 'items': {'type': float, 'gt': 0}},
+    }
+    validator = JsonValidator(constrain)
+    json = {'a': list(range(1, 1000)), 'b': [0.5, float('inf')]}
+    res, errors = validator.validate(json)
+    assert res == json and res['a'] is not json['a']
+    assert errors == {}
+
+    res, errors = validator.validate({
+        'a': [1, True, 0, 'x'], 'b': [1.5, float('nan')]})
+    assert res == {'a': [1, True], 'b': [1.5]}
+    assert errors == {'a': ['Not greater than 0', 'Bad data type'],
+                      'b': ['Not greater than 0']}
+    assert validator.first_error({'a': [1, 1000], 'b': []}) == (
+        'a.1', 'Not less than 1000')
+
+
+@pytest.mark.parametrize('dformat,value', [
+    ('%Y', '2020'),
+    ('%Y-%m-%d', '2020-01-02'),
+    ('%Y-%m-%d', '2020-1-2'),
+    ('%Y-%m-%d', '2020-02-30'),
+    ('%Y-%m-%dT%H:%M:%S', '2020-01-02T10:11:12'),
+    ('%Y-%m-%dT%H:%M:%S', '2020-01-02t10:11:12'),
+    ('%Y-%m-%dT%H:%M:%S', '2020-01-02T24:11:12'),
+    ('%Y-%m-%dT%H:%M:%S.%f', '2020-01-02T10:11:12.123'),
+    ('%Y-%m-%dT%H:%M:%S.%f', '2020-01-02T10:11:12.1234'),
+    ('%Y-%m-%dT%H:%M:%S.%f', '2020-01-02T10:11:12.123456'),
+    ('%d/%m/%Y', '02/01/2020'),
+])
+def test_date_parser(dformat, value):
+    """Test common dformats are parsed as strptime does."""
+    validator = JsonValidator({
+        'a': {'type': datetime, 'dformat': dformat, 'dformat_error': 'Bad'}})
+    try:
+        expected = ({'a': datetime.strptime(value, dformat)}, {})
+    except ValueError:
+        expected = ({}, {'a': 'Bad'})
+    assert validator.validate({'a': value}) == expected